@@ -1,42 +1,84 @@
 use anyhow::{Context, Result};
-use log::{error, info, warn};
+use log::{debug, error, info, warn};
 use reqwest::blocking::Client;
 use reqwest::header::{HeaderMap, HeaderValue, AUTHORIZATION, CONTENT_TYPE};
+use serde::Deserialize;
 use serde_json::json;
-use std::collections::HashMap;
+use std::borrow::Cow;
+use std::collections::{HashMap, HashSet};
+use std::sync::{Arc, Mutex};
 
 use crate::models::{CqlResponse, LabelsResponse, SearchResultItem};
 use base64::engine::general_purpose::STANDARD as BASE64;
 use base64::Engine;
 
+mod rate_limit;
+pub use rate_limit::RateLimiter;
+
+/// Fields expanded on every CQL search result
+const SEARCH_EXPAND: &str = "content.space,content.metadata.labels";
+/// Upper bound on the capacity reserved from a search's reported total
+const MAX_PRESIZED_RESULTS: usize = 10_000;
+
 pub struct ConfluenceClient {
     client: Client,
     base_url: String,
-    username: String,
-    token: String,
+    rate_limiter: Option<RateLimiter>,
+    /// Whether CQL results and page labels are cached for the run
+    caching: bool,
+    /// CQL results already fetched during this run, keyed by trimmed query
+    /// and batch size. Cleared whenever a label is written, since that can
+    /// change what matches.
+    cql_cache: Mutex<HashMap<(String, usize), Arc<[SearchResultItem]>>>,
+    /// Labels already fetched during this run, keyed by page ID.
+    /// A page's entry is dropped when one of its labels is written.
+    tag_cache: Mutex<HashMap<String, Vec<String>>>,
 }
 
 impl ConfluenceClient {
     pub fn new(base_url: String, username: String, token: String) -> Self {
         Self {
-            client: Client::new(),
+            client: Self::build_http_client(&username, &token),
             base_url: base_url.trim_end_matches('/').to_string(),
-            username,
-            token,
+            rate_limiter: None,
+            caching: true,
+            cql_cache: Mutex::new(HashMap::new()),
+            tag_cache: Mutex::new(HashMap::new()),
         }
     }
 
-    pub fn base_url(&self) -> &str {
-        &self.base_url
-    }
-
-    fn headers(&self) -> HeaderMap {
+    /// Build the HTTP client once so every request reuses its keep-alive
+    /// connection pool and the precomputed authentication headers.
+    fn build_http_client(username: &str, token: &str) -> Client {
         let mut headers = HeaderMap::new();
-        let auth = format!("{}:{}", self.username, self.token);
+        let auth = format!("{}:{}", username, token);
         let auth_header = format!("Basic {}", BASE64.encode(auth));
-        headers.insert(AUTHORIZATION, HeaderValue::from_str(&auth_header).unwrap());
+        let mut auth_value = HeaderValue::from_str(&auth_header).unwrap();
+        auth_value.set_sensitive(true);
+        headers.insert(AUTHORIZATION, auth_value);
         headers.insert(CONTENT_TYPE, HeaderValue::from_static("application/json"));
-        headers
+        Client::builder()
+            .default_headers(headers)
+            .tcp_keepalive(std::time::Duration::from_secs(60))
+            .build()
+            .expect("Failed to build HTTP client")
+    }
+
+    /// Limit outgoing requests to `requests_per_second` across all threads
+    pub fn with_rate_limit(mut self, requests_per_second: f64) -> Self {
+        let burst = requests_per_second.ceil() as usize;
+        self.rate_limiter = Some(RateLimiter::new(requests_per_second, burst));
+        self
+    }
+
+    /// Always go to the server instead of reusing results fetched earlier in the run
+    pub fn without_caching(mut self) -> Self {
+        self.caching = false;
+        self
+    }
+
+    pub fn base_url(&self) -> &str {
+        &self.base_url
     }
 
     fn send_request<F>(&self, build_request: F) -> Result<reqwest::blocking::Response>
@@ -49,6 +91,9 @@ impl ConfluenceClient {
 
         loop {
             attempt += 1;
+            if let Some(limiter) = &self.rate_limiter {
+                limiter.acquire();
+            }
             let request = build_request();
             match request.send() {
                 Ok(response) => {
@@ -58,21 +103,18 @@ impl ConfluenceClient {
                         if attempt > MAX_RETRIES {
                             return Ok(response);
                         }
-                        let mut wait_duration = delay;
-                        if status == reqwest::StatusCode::TOO_MANY_REQUESTS {
-                            if let Some(retry_after) =
-                                response.headers().get(reqwest::header::RETRY_AFTER)
-                            {
-                                if let Ok(retry_str) = retry_after.to_str() {
-                                    if let Ok(seconds) = retry_str.parse::<u64>() {
-                                        wait_duration = std::time::Duration::from_secs(seconds);
-                                    }
-                                }
-                            }
-                        }
+                        let retry_after = retry_after(status, response.headers());
+                        let mut wait_duration = retry_after.unwrap_or(delay);
                         // Add jitter
                         let jitter_ms = fastrand::u64(..1000);
                         wait_duration += std::time::Duration::from_millis(jitter_ms);
+                        // The server asked everyone to back off, so hold back
+                        // every other worker too, not just this one
+                        if retry_after.is_some() {
+                            if let Some(limiter) = &self.rate_limiter {
+                                limiter.pause(wait_duration);
+                            }
+                        }
                         warn!(
                             "Request failed with status {}, retrying in {:?} (attempt {}/{})",
                             status, wait_duration, attempt, MAX_RETRIES
@@ -109,23 +151,33 @@ impl ConfluenceClient {
         limit: usize,
         next_url: Option<&str>,
     ) -> Result<(Vec<SearchResultItem>, Option<String>)> {
-        let _expand_str = "content.space,content.metadata.labels,content.version";
+        let (pages, next_link, _) = self.fetch_cql_page(cql_expression, limit, next_url)?;
+        Ok((pages, next_link))
+    }
 
+    /// Like [`Self::execute_cql_query`], also returning the server's `totalSize`
+    fn fetch_cql_page(
+        &self,
+        cql_expression: &str,
+        limit: usize,
+        next_url: Option<&str>,
+    ) -> Result<(Vec<SearchResultItem>, Option<String>, Option<usize>)> {
         // If we have a next_url, use it directly; otherwise build the initial URL
         let url = if let Some(next) = next_url {
             format!("{}/wiki{}", self.base_url, next)
         } else {
             format!(
-                "{}/wiki/rest/api/search?cql={}&limit={}&expand=content.space,content.metadata.labels,content.version",
+                "{}/wiki/rest/api/search?cql={}&limit={}&expand={}",
                 self.base_url,
                 urlencoding::encode(cql_expression),
-                limit
+                limit,
+                SEARCH_EXPAND
             )
         };
 
-        info!("Executing CQL query: {} (limit: {})", cql_expression, limit);
+        debug!("Executing CQL query: {} (limit: {})", cql_expression, limit);
         let response = self
-            .send_request(|| self.client.get(&url).headers(self.headers()))
+            .send_request(|| self.client.get(&url))
             .context("Failed to execute CQL query")?;
 
         if !response.status().is_success() {
@@ -134,14 +186,14 @@ impl ConfluenceClient {
             anyhow::bail!("CQL query failed with status {}: {}", status, error_text);
         }
         let cql_response: CqlResponse = response.json().context("Failed to parse CQL response")?;
-        let mut pages = Vec::new();
-        for item in cql_response.results {
-            match serde_json::from_value::<SearchResultItem>(item.clone()) {
+        // Deserialize from borrowed values: the fallbacks below may need to
+        // look at the same item again, and this avoids cloning it each time
+        let mut pages = Vec::with_capacity(cql_response.results.len());
+        for item in &cql_response.results {
+            match SearchResultItem::deserialize(item) {
                 Ok(mut page) => {
                     if page.content.is_none() {
-                        if let Ok(c) =
-                            serde_json::from_value::<crate::models::Content>(item.clone())
-                        {
+                        if let Ok(c) = crate::models::Content::deserialize(item) {
                             page.content = Some(c);
                         }
                     }
@@ -149,7 +201,7 @@ impl ConfluenceClient {
                 }
                 Err(e) => {
                     warn!("Failed to parse search result item: {}", e);
-                    if let Ok(c) = serde_json::from_value::<crate::models::Content>(item.clone()) {
+                    if let Ok(c) = crate::models::Content::deserialize(item) {
                         let minimal = SearchResultItem {
                             title: c.title.clone(),
                             content: Some(c),
@@ -171,13 +223,30 @@ impl ConfluenceClient {
             .and_then(|v| v.as_str())
             .map(|s| s.to_string());
 
-        info!(
+        debug!(
             "CQL query returned {} results (totalSize: {:?}, has_next: {})",
             result_count,
             cql_response.total_size,
             next_link.is_some()
         );
-        Ok((pages, next_link))
+        let total_size = cql_response
+            .total_size
+            .and_then(|n| usize::try_from(n).ok());
+        Ok((pages, next_link, total_size))
+    }
+
+    /// Iterate over the results of a CQL query one batch at a time.
+    /// Each batch is fetched lazily when the iterator is advanced, so callers
+    /// can start working before the last batch arrives. Results are not cached.
+    pub fn cql_batches<'a>(&'a self, cql_expression: &'a str, batch_size: usize) -> CqlBatches<'a> {
+        CqlBatches {
+            client: self,
+            cql_expression,
+            batch_size,
+            next_url: None,
+            total_size: None,
+            done: false,
+        }
     }
 
     /// Get all results for a CQL query, handling pagination
@@ -186,7 +255,7 @@ impl ConfluenceClient {
         &self,
         cql_expression: &str,
         batch_size: usize,
-    ) -> Result<Vec<SearchResultItem>> {
+    ) -> Result<Arc<[SearchResultItem]>> {
         self.get_all_cql_results_with_progress(cql_expression, batch_size, None::<fn(usize, usize)>)
     }
 
@@ -196,46 +265,113 @@ impl ConfluenceClient {
         cql_expression: &str,
         batch_size: usize,
         mut progress_callback: Option<F>,
-    ) -> Result<Vec<SearchResultItem>>
+    ) -> Result<Arc<[SearchResultItem]>>
     where
         F: FnMut(usize, usize),
     {
-        let mut all_pages = Vec::new();
-        let mut next_url: Option<String> = None;
-
-        loop {
-            let (batch, next) =
-                self.execute_cql_query(cql_expression, batch_size, next_url.as_deref())?;
-
-            if batch.is_empty() {
-                break;
+        let cache_key = (cql_cache_key(cql_expression), batch_size);
+        if self.caching {
+            if let Ok(cache) = self.cql_cache.lock() {
+                if let Some(pages) = cache.get(&cache_key) {
+                    info!("Using cached results for CQL query: {}", cql_expression);
+                    return Ok(Arc::clone(pages));
+                }
             }
+        }
 
+        let mut all_pages = Vec::new();
+        let mut batches = self.cql_batches(cql_expression, batch_size);
+        while let Some(batch) = batches.next() {
+            let batch = batch?;
             let batch_len = batch.len();
+            if all_pages.is_empty() {
+                // Size the result up front from the reported total, capped
+                // in case the server's estimate is far off
+                if let Some(total) = batches.total_size() {
+                    all_pages.reserve(total.min(MAX_PRESIZED_RESULTS));
+                }
+            }
             all_pages.extend(batch);
 
             // Call progress callback with current total
             if let Some(ref mut callback) = progress_callback {
                 callback(all_pages.len(), batch_len);
             }
+        }
 
-            // Break if no more pages
-            if next.is_none() {
-                break;
+        dedup_by_page_id(&mut all_pages);
+        info!(
+            "CQL query returned {} results: {}",
+            all_pages.len(),
+            cql_expression
+        );
+        let all_pages: Arc<[SearchResultItem]> = all_pages.into();
+        if self.caching {
+            if let Ok(mut cache) = self.cql_cache.lock() {
+                cache.insert(cache_key, Arc::clone(&all_pages));
             }
+        }
+        Ok(all_pages)
+    }
+
+    /// Run several searches concurrently and keep their results in the cache,
+    /// so later calls to [`Self::get_all_cql_results`] return immediately.
+    /// Failures are logged as warnings; the later call retries the search.
+    /// Does nothing when caching is disabled.
+    pub fn prefetch_cql_results<S: AsRef<str> + Sync>(
+        &self,
+        cql_expressions: &[S],
+        batch_size: usize,
+    ) {
+        use rayon::prelude::*;
 
-            next_url = next;
+        if !self.caching {
+            return;
         }
+        let mut seen = HashSet::new();
+        let distinct: Vec<&str> = cql_expressions
+            .iter()
+            .map(AsRef::as_ref)
+            .filter(|cql| seen.insert(cql_cache_key(cql)))
+            .collect();
+        distinct.par_iter().for_each(|cql| {
+            if let Err(e) = self.get_all_cql_results(cql, batch_size) {
+                warn!("Prefetching CQL query failed: {}: {}", cql, e);
+            }
+        });
+    }
 
-        Ok(all_pages)
+    /// Forget cached CQL results after a label change
+    fn invalidate_cql_cache(&self) {
+        if let Ok(mut cache) = self.cql_cache.lock() {
+            cache.clear();
+        }
+    }
+
+    /// Forget a page's cached labels after writing to it
+    fn invalidate_page_tags(&self, page_id: &str) {
+        if let Ok(mut cache) = self.tag_cache.lock() {
+            cache.remove(page_id);
+        }
     }
 
     /// Get all tags for a specific page
     pub fn get_page_tags(&self, page_id: &str) -> Result<Vec<String>> {
+        if self.caching {
+            if let Some(tags) = self
+                .tag_cache
+                .lock()
+                .ok()
+                .and_then(|cache| cache.get(page_id).cloned())
+            {
+                return Ok(tags);
+            }
+        }
+
         let url = format!("{}/wiki/rest/api/content/{}/label", self.base_url, page_id);
 
         let response = self
-            .send_request(|| self.client.get(&url).headers(self.headers()))
+            .send_request(|| self.client.get(&url))
             .context("Failed to get page labels")?;
 
         if !response.status().is_success() {
@@ -245,36 +381,53 @@ impl ConfluenceClient {
         let labels_response: LabelsResponse =
             response.json().context("Failed to parse labels response")?;
 
-        Ok(labels_response
+        let tags: Vec<String> = labels_response
             .results
             .into_iter()
             .map(|l| l.name)
-            .collect())
+            .collect();
+        if self.caching {
+            if let Ok(mut cache) = self.tag_cache.lock() {
+                cache.insert(page_id.to_string(), tags.clone());
+            }
+        }
+        Ok(tags)
     }
 
     /// Add a tag to a Confluence page
     pub fn add_tag(&self, page_id: &str, tag: &str) -> Result<()> {
+        self.add_labels(page_id, &[tag])
+    }
+
+    /// Add several labels to a page with a single request; the label
+    /// endpoint accepts an array of labels
+    fn add_labels<S: AsRef<str> + std::fmt::Debug>(&self, page_id: &str, tags: &[S]) -> Result<()> {
         let url = format!("{}/wiki/rest/api/content/{}/label", self.base_url, page_id);
 
-        let body = json!([{"name": tag}]);
+        let body: Vec<_> = tags
+            .iter()
+            .map(|tag| json!({"name": tag.as_ref()}))
+            .collect();
 
         let response = self
-            .send_request(|| self.client.post(&url).headers(self.headers()).json(&body))
-            .context("Failed to add tag")?;
+            .send_request(|| self.client.post(&url).json(&body))
+            .context("Failed to add tags")?;
 
         if !response.status().is_success() {
             let status = response.status();
             let error_text = response.text().unwrap_or_default();
             anyhow::bail!(
-                "Failed to add tag '{}' to page {}: {} - {}",
-                tag,
+                "Failed to add tags {:?} to page {}: {} - {}",
+                tags,
                 page_id,
                 status,
                 error_text
             );
         }
 
-        info!("Added tag '{}' to page {}", tag, page_id);
+        self.invalidate_cql_cache();
+        self.invalidate_page_tags(page_id);
+        debug!("Added tags {:?} to page {}", tags, page_id);
         Ok(())
     }
 
@@ -288,7 +441,7 @@ impl ConfluenceClient {
         );
 
         let response = self
-            .send_request(|| self.client.delete(&url).headers(self.headers()))
+            .send_request(|| self.client.delete(&url))
             .context("Failed to remove tag")?;
 
         if !response.status().is_success() {
@@ -303,20 +456,24 @@ impl ConfluenceClient {
             );
         }
 
-        info!("Removed tag '{}' from page {}", tag, page_id);
+        self.invalidate_cql_cache();
+        self.invalidate_page_tags(page_id);
+        debug!("Removed tag '{}' from page {}", tag, page_id);
         Ok(())
     }
 
     /// Add multiple tags to a page
     pub fn add_tags(&self, page_id: &str, tags: &[String]) -> bool {
-        let mut success = true;
-        for tag in tags {
-            if let Err(e) = self.add_tag(page_id, tag) {
-                error!("Error adding tag '{}' to page {}: {}", tag, page_id, e);
-                success = false;
+        if tags.is_empty() {
+            return true;
+        }
+        match self.add_labels(page_id, tags) {
+            Ok(()) => true,
+            Err(e) => {
+                error!("Error adding tags {:?} to page {}: {}", tags, page_id, e);
+                false
             }
         }
-        success
     }
 
     /// Remove multiple tags from a page
@@ -333,15 +490,22 @@ impl ConfluenceClient {
 
     /// Replace tags on a page
     pub fn replace_tags(&self, page_id: &str, tag_mapping: &HashMap<String, String>) -> bool {
-        let current_tags = match self.get_page_tags(page_id) {
-            Ok(tags) => tags,
+        // Nothing to replace, so don't fetch the page's labels at all
+        if tag_mapping.is_empty() {
+            return true;
+        }
+
+        let current_tags: HashSet<String> = match self.get_page_tags(page_id) {
+            Ok(tags) => tags.into_iter().collect(),
             Err(e) => {
                 error!("Failed to get current tags for page {}: {}", page_id, e);
                 return false;
             }
         };
 
+        // Remove each matched tag, then add all of their replacements in one request
         let mut success = true;
+        let mut new_tags: Vec<&str> = Vec::new();
         for (old_tag, new_tag) in tag_mapping {
             if current_tags.contains(old_tag) {
                 if let Err(e) = self.remove_tag(page_id, old_tag) {
@@ -352,23 +516,124 @@ impl ConfluenceClient {
                     success = false;
                     continue;
                 }
-                if let Err(e) = self.add_tag(page_id, new_tag) {
-                    error!("Error adding tag '{}' to page {}: {}", new_tag, page_id, e);
-                    success = false;
-                } else {
-                    info!(
-                        "Replaced tag '{}' with '{}' on page {}",
-                        old_tag, new_tag, page_id
-                    );
+                if !new_tags.contains(&new_tag.as_str()) {
+                    new_tags.push(new_tag);
                 }
             }
         }
+        if !new_tags.is_empty() {
+            if let Err(e) = self.add_labels(page_id, &new_tags) {
+                error!(
+                    "Error adding tags {:?} to page {}: {}",
+                    new_tags, page_id, e
+                );
+                success = false;
+            } else {
+                debug!("Replaced tags on page {} with {:?}", page_id, new_tags);
+            }
+        }
         success
     }
 }
 
+/// Lazily paginated CQL results, see [`ConfluenceClient::cql_batches`]
+pub struct CqlBatches<'a> {
+    client: &'a ConfluenceClient,
+    cql_expression: &'a str,
+    batch_size: usize,
+    next_url: Option<String>,
+    total_size: Option<usize>,
+    done: bool,
+}
+
+impl CqlBatches<'_> {
+    /// Total number of matches reported by the server, known after the first batch
+    pub fn total_size(&self) -> Option<usize> {
+        self.total_size
+    }
+}
+
+impl Iterator for CqlBatches<'_> {
+    type Item = Result<Vec<SearchResultItem>>;
+
+    fn next(&mut self) -> Option<Self::Item> {
+        if self.done {
+            return None;
+        }
+        match self.client.fetch_cql_page(
+            self.cql_expression,
+            self.batch_size,
+            self.next_url.as_deref(),
+        ) {
+            Ok((batch, next, total_size)) => {
+                self.total_size = self.total_size.or(total_size);
+                if batch.is_empty() {
+                    self.done = true;
+                    return None;
+                }
+                // Stop after this batch if there is no cursor to follow
+                self.done = next.is_none();
+                self.next_url = next;
+                Some(Ok(batch))
+            }
+            Err(e) => {
+                self.done = true;
+                Some(Err(e))
+            }
+        }
+    }
+}
+
 pub use crate::models::sanitize_text;
 
+/// Exclude pages matching `exclude` from `cql` in the query itself, so the
+/// server filters them out instead of ctag fetching both sets.
+/// A missing or blank exclusion leaves the query unchanged.
+pub fn exclude_cql<'a>(cql: &'a str, exclude: Option<&str>) -> Cow<'a, str> {
+    match exclude.map(str::trim).filter(|e| !e.is_empty()) {
+        Some(exclude) => Cow::Owned(format!("({}) AND NOT ({})", cql, exclude)),
+        None => Cow::Borrowed(cql),
+    }
+}
+
+/// Drop repeats of a page, which a search can return more than once when
+/// results shift between paginated requests. Items without an ID are kept.
+fn dedup_by_page_id(pages: &mut Vec<SearchResultItem>) {
+    let mut seen = HashSet::with_capacity(pages.len());
+    let before = pages.len();
+    pages.retain(|page| page.page_id().is_none_or(|id| seen.insert(id.to_string())));
+    if pages.len() < before {
+        debug!("Dropped {} duplicate search results", before - pages.len());
+    }
+}
+
+/// The wait a 429 or 503 response asks for in its `Retry-After` header, in
+/// seconds. Other statuses and unparseable values give `None`.
+fn retry_after(
+    status: reqwest::StatusCode,
+    headers: &reqwest::header::HeaderMap,
+) -> Option<std::time::Duration> {
+    if status != reqwest::StatusCode::TOO_MANY_REQUESTS
+        && status != reqwest::StatusCode::SERVICE_UNAVAILABLE
+    {
+        return None;
+    }
+    let seconds = headers
+        .get(reqwest::header::RETRY_AFTER)?
+        .to_str()
+        .ok()?
+        .parse::<u64>()
+        .ok()?;
+    Some(std::time::Duration::from_secs(seconds))
+}
+
+/// Cache key for a CQL query: the query with surrounding whitespace trimmed.
+/// Inner whitespace is kept, as it can be part of a quoted literal, so queries
+/// that differ only in inner whitespace are cached separately.
+fn cql_cache_key(cql: &str) -> String {
+    cql.trim().to_string()
+}
+
 /// Filter tags that match any of the provided regexes
 pub fn filter_tags_by_regex(tags: Vec<String>, regexes: &[regex::Regex]) -> Vec<String> {
     tags.into_iter()
@@ -427,6 +692,70 @@ mod tests {
         assert!(output2.contains("&"), "Expected & in output: {}", output2);
     }
 
+    #[test]
+    fn sanitize_text_returns_plain_text_unchanged() {
+        let input = "Release notes: v1.2 (draft)\twith 🔒";
+        assert_eq!(sanitize_text(input), input);
+    }
+
+    #[test]
+    fn exclude_cql_wraps_both_expressions() {
+        assert_eq!(
+            exclude_cql("space = DOCS OR space = KB", Some("label = archived")),
+            "(space = DOCS OR space = KB) AND NOT (label = archived)"
+        );
+        assert_eq!(exclude_cql("space = DOCS", Some("  ")), "space = DOCS");
+        assert_eq!(exclude_cql("space = DOCS", None), "space = DOCS");
+    }
+
+    #[test]
+    fn dedup_by_page_id_keeps_first_occurrence() {
+        let mut pages: Vec<SearchResultItem> = serde_json::from_value(json!([
+            {"title": "a", "content": {"id": "1"}},
+            {"title": "b", "content": {"id": "2"}},
+            {"title": "a again", "content": {"id": "1"}},
+            {"title": "no id"}
+        ]))
+        .unwrap();
+        dedup_by_page_id(&mut pages);
+        let titles: Vec<_> = pages.iter().filter_map(|p| p.title.as_deref()).collect();
+        assert_eq!(titles, ["a", "b", "no id"]);
+    }
+
+    #[test]
+    fn retry_after_applies_to_429_and_503() {
+        use reqwest::header::{HeaderMap, HeaderValue, RETRY_AFTER};
+        use reqwest::StatusCode;
+        use std::time::Duration;
+
+        let mut headers = HeaderMap::new();
+        headers.insert(RETRY_AFTER, HeaderValue::from_static("7"));
+        assert_eq!(
+            retry_after(StatusCode::SERVICE_UNAVAILABLE, &headers),
+            Some(Duration::from_secs(7))
+        );
+        assert_eq!(
+            retry_after(StatusCode::TOO_MANY_REQUESTS, &headers),
+            Some(Duration::from_secs(7))
+        );
+        assert_eq!(retry_after(StatusCode::BAD_GATEWAY, &headers), None);
+        assert_eq!(
+            retry_after(StatusCode::SERVICE_UNAVAILABLE, &HeaderMap::new()),
+            None
+        );
+        headers.insert(RETRY_AFTER, HeaderValue::from_static("soon"));
+        assert_eq!(retry_after(StatusCode::SERVICE_UNAVAILABLE, &headers), None);
+    }
+
+    #[test]
+    fn cql_cache_key_keeps_inner_whitespace() {
+        assert_eq!(cql_cache_key("  space = DOCS \n"), "space = DOCS");
+        assert_ne!(
+            cql_cache_key(r#"title = "a  b""#),
+            cql_cache_key(r#"title = "a b""#)
+        );
+    }
+
     #[test]
     fn filter_tags_by_regex_works() {
         let tags = vec![
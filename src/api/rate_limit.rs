@@ -0,0 +1,97 @@
+use std::sync::Mutex;
+use std::time::{Duration, Instant};
+
+/// Token-bucket limiter shared by every request a client sends.
+///
+/// Tokens refill continuously at `rate` per second up to `burst`. Worker
+/// threads block in [`RateLimiter::acquire`] until a token is available, so the
+/// combined request rate of a parallel run stays under the configured limit.
+pub struct RateLimiter {
+    rate: f64,
+    burst: f64,
+    state: Mutex<BucketState>,
+}
+
+struct BucketState {
+    tokens: f64,
+    /// Point from which tokens accrue; may lie in the future after a pause
+    last_refill: Instant,
+}
+
+impl RateLimiter {
+    /// Create a limiter allowing `rate_per_sec` requests per second with bursts of up to `burst`
+    pub fn new(rate_per_sec: f64, burst: usize) -> Self {
+        let burst = burst.max(1) as f64;
+        Self {
+            rate: rate_per_sec,
+            burst,
+            state: Mutex::new(BucketState {
+                tokens: burst,
+                last_refill: Instant::now(),
+            }),
+        }
+    }
+
+    /// Block until a request may be sent
+    pub fn acquire(&self) {
+        loop {
+            let wait = {
+                let mut state = self.state.lock().unwrap_or_else(|e| e.into_inner());
+                let now = Instant::now();
+                if now > state.last_refill {
+                    let elapsed = now.duration_since(state.last_refill).as_secs_f64();
+                    state.tokens = (state.tokens + elapsed * self.rate).min(self.burst);
+                    state.last_refill = now;
+                }
+                if state.tokens >= 1.0 {
+                    state.tokens -= 1.0;
+                    return;
+                }
+                state.last_refill.saturating_duration_since(now)
+                    + Duration::from_secs_f64((1.0 - state.tokens) / self.rate)
+            };
+            std::thread::sleep(wait);
+        }
+    }
+
+    /// Empty the bucket and stop refilling for `duration`.
+    /// Used when the server asks us to back off so that other threads wait too.
+    pub fn pause(&self, duration: Duration) {
+        let mut state = self.state.lock().unwrap_or_else(|e| e.into_inner());
+        state.tokens = 0.0;
+        state.last_refill = state.last_refill.max(Instant::now() + duration);
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn acquire_within_burst_does_not_block() {
+        let limiter = RateLimiter::new(1.0, 3);
+        let start = Instant::now();
+        for _ in 0..3 {
+            limiter.acquire();
+        }
+        assert!(start.elapsed() < Duration::from_millis(500));
+    }
+
+    #[test]
+    fn acquire_waits_once_burst_is_spent() {
+        let limiter = RateLimiter::new(50.0, 1);
+        limiter.acquire();
+        let start = Instant::now();
+        limiter.acquire();
+        assert!(start.elapsed() >= Duration::from_millis(15));
+    }
+
+    #[test]
+    fn pause_delays_next_acquire() {
+        let limiter = RateLimiter::new(1000.0, 10);
+        limiter.pause(Duration::from_millis(50));
+        let start = Instant::now();
+        limiter.acquire();
+        assert!(start.elapsed() >= Duration::from_millis(40));
+    }
+}
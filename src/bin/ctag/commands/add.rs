@@ -4,7 +4,8 @@ use clap::Args;
 use colored::Colorize;
 use ctag::api::ConfluenceClient;
 use ctag::models::ProcessResults;
-use dialoguer::Confirm;
+use std::borrow::Cow;
+use std::io::{self, BufWriter, Write};
 
 #[derive(Args)]
 #[command(after_help = "\
@@ -21,11 +22,18 @@ EXAMPLES:
   # Interactive mode with confirmation
   ctag add --interactive 'label = review' approved
 
+  # Skip pages that are already archived
+  ctag add 'space = DOCS' reviewed --cql-exclude 'label = archived'
+
 ")]
 pub struct AddArgs {
     /// CQL expression to match pages
     pub cql_expression: String,
 
+    /// CQL expression matching pages to leave untouched
+    #[arg(long)]
+    pub cql_exclude: Option<String>,
+
     /// Tags to add
     #[arg(required = true)]
     pub tags: Vec<String>,
@@ -45,144 +53,113 @@ pub fn run(
     dry_run: bool,
     show_progress: bool,
     format: ctag::models::OutputFormat,
-) -> Result<()> {
+    show_summary: bool,
+) -> Result<ProcessResults> {
     let verbose = format.is_verbose();
     if verbose {
         ui::print_header("ADD TAGS");
     }
-    // Get matching pages
-    let pages = crate::commands::get_matching_pages(
+    let pages = crate::commands::find_target_pages(
         client,
         &args.cql_expression,
-        100,
+        args.cql_exclude.as_deref(),
+        dry_run,
         format,
         show_progress,
     )?;
-
     if pages.is_empty() {
-        ui::print_warning("No pages found matching the CQL expression.");
-        if dry_run {
-            ui::print_dry_run("No changes will be made.");
-        }
-        return Ok(());
+        return Ok(ProcessResults::new(0));
     }
 
-    if verbose {
-        ui::print_info(&format!("Found {} matching pages.", pages.len()));
-    }
+    // The tag lines are identical for every page, so render them once
+    let substeps: Vec<String> = args
+        .tags
+        .iter()
+        .map(|tag| format!("{}: {}", "Add".green(), tag))
+        .collect();
 
     if dry_run {
         ui::print_dry_run("No changes will be made.");
-        for page in &pages {
+        let mut out = BufWriter::new(io::stderr().lock());
+        for page in pages.iter() {
             let space = page.space_name();
             let display_title = page.printable_clickable_title(client.base_url());
 
-            ui::print_page_action("Would add tags to", &display_title, space);
-            for tag in &args.tags {
-                ui::print_substep(&format!("{}: {}", "Add".green(), tag));
-            }
+            ui::write_page_action(
+                &mut out,
+                "Would add tags to",
+                &display_title,
+                space,
+                &substeps,
+            )?;
         }
-        return Ok(());
+        out.flush()?;
+        return Ok(ProcessResults::new(pages.len()));
     }
 
     // Process the pages
-    let mut results = ProcessResults::new(pages.len());
-    if args.interactive {
+    let results = if args.interactive {
         // Interactive mode: sequential processing
-        let progress = if show_progress {
-            Some(ui::create_progress_bar(pages.len() as u64))
-        } else {
-            None
-        };
-        for page in &pages {
-            let page_id = match page.page_id() {
-                Some(id) => id,
-                None => {
-                    results.skipped += 1;
-                    continue;
-                }
-            };
-            let space = page.space_name();
-            let display_title = page.printable_clickable_title(client.base_url());
-            if let Some(pb) = &progress {
-                pb.suspend(|| {
-                    ui::print_page_action("Adding tags to", &display_title, space);
-                    for tag in &args.tags {
-                        ui::print_substep(&format!("{}: {}", "Add".green(), tag));
+        let prompt = format!(
+            "Add tags {:?}? (Enter '{}' to abort)",
+            args.tags, args.abort_key
+        );
+        crate::commands::process_pages_interactive(
+            client,
+            &pages,
+            show_progress,
+            "Adding tags to",
+            |_| {
+                Ok(Some(crate::commands::PlannedChange {
+                    change: (),
+                    substeps: Cow::Borrowed(&substeps),
+                    prompt: Cow::Borrowed(&prompt),
+                }))
+            },
+            |page_id, _| {
+                if client.add_tags(page_id, &args.tags) {
+                    crate::commands::ActionResult::Success {
+                        added: args.tags.len(),
+                        removed: 0,
+                        detail: None,
                     }
-                });
-            } else {
-                ui::print_page_action("Adding tags to", &display_title, space);
-                for tag in &args.tags {
-                    ui::print_substep(&format!("{}: {}", "Add".green(), tag));
+                } else {
+                    crate::commands::ActionResult::Failed
                 }
-            }
-            let prompt = format!(
-                "Add tags {:?}? (Enter '{}' to abort)",
-                args.tags, args.abort_key
-            );
-            let confirmed = if let Some(pb) = &progress {
-                pb.suspend(|| Confirm::new().with_prompt(&prompt).interact())
-            } else {
-                Confirm::new().with_prompt(&prompt).interact()
-            };
-            match confirmed {
-                Ok(true) => {}
-                Ok(false) => {
-                    results.skipped += 1;
-                    if let Some(pb) = &progress {
-                        pb.inc(1);
-                    }
-                    continue;
-                }
-                Err(_) => {
-                    results.aborted = true;
-                    break;
-                }
-            }
-            let success = client.add_tags(page_id, &args.tags);
-            results.processed += 1;
-            if success {
-                results.success += 1;
-                results.tags_added += args.tags.len();
-            } else {
-                results.failed += 1;
-            }
-            if let Some(pb) = &progress {
-                pb.inc(1);
-            }
-        }
-        if let Some(pb) = progress {
-            pb.finish_with_message("Done");
-        }
+            },
+        )?
     } else {
         // Non-interactive mode: parallel processing
-        results = crate::commands::process_pages_parallel(&pages, show_progress, |page| {
+        // Per-page details only appear in JSON output, so skip building them otherwise
+        let record_details = format == ctag::models::OutputFormat::Json;
+        crate::commands::process_pages_parallel(&pages, show_progress, |page| {
             let page_id = match page.page_id() {
                 Some(id) => id,
                 None => return crate::commands::ActionResult::Skipped,
             };
             if client.add_tags(page_id, &args.tags) {
-                let detail = ctag::models::ActionDetail {
-                    page_id: page_id.to_string(),
-                    title: page.title.as_deref().unwrap_or("Unknown").to_string(),
-                    space: page.space_name().to_string(),
-                    url: page.printable_clickable_title(client.base_url()),
-                    tags_added: args.tags.clone(),
-                    tags_removed: vec![],
-                };
+                let detail = record_details.then(|| {
+                    ctag::models::ActionDetail::new(
+                        page,
+                        client.base_url(),
+                        args.tags.clone(),
+                        vec![],
+                    )
+                });
                 crate::commands::ActionResult::Success {
                     added: args.tags.len(),
                     removed: 0,
-                    detail: Some(detail),
+                    detail,
                 }
             } else {
                 crate::commands::ActionResult::Failed
             }
-        });
-    }
+        })
+    };
 
     // Display results
-    ui::print_summary(&results, format);
-    Ok(())
+    if show_summary {
+        ui::print_summary(&results, format)?;
+    }
+    Ok(results)
 }
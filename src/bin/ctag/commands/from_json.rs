@@ -1,3 +1,6 @@
+use crate::commands::add::AddArgs;
+use crate::commands::remove::RemoveArgs;
+use crate::commands::replace::ReplaceArgs;
 use crate::ui;
 use anyhow::{Context, Result};
 use clap::Args;
@@ -5,6 +8,7 @@ use ctag::api::ConfluenceClient;
 use ctag::models::{OutputFormat, ProcessResults};
 use serde::{Deserialize, Serialize};
 use serde_json::Value;
+use std::borrow::Cow;
 use std::fs;
 
 #[derive(Args)]
@@ -27,6 +31,9 @@ pub(crate) struct JsonCommands {
 pub(crate) struct JsonCommand {
     pub action: String,
     pub cql_expression: String,
+    /// Pages matching this CQL expression are left untouched
+    #[serde(default)]
+    pub cql_exclude: Option<String>,
     /// Tags field is overloaded to match the original Python implementation:
     /// - For "add" and "remove": array of strings, e.g. ["tag1", "tag2"]
     /// - For "replace": object mapping "old" -> "new", e.g. {"old-tag": "new-tag"}
@@ -45,17 +52,41 @@ pub fn run(
     progress: bool,
     format: OutputFormat,
 ) -> Result<()> {
-    let verbose = format.is_verbose();
-    let is_structured = format.is_structured();
-    if verbose {
+    if format.is_verbose() {
         ui::print_header("EXECUTE FROM JSON");
     }
     // Read and parse JSON file
-    let json_content = fs::read_to_string(&args.json_file)
+    let json_content = fs::read(&args.json_file)
         .context(format!("Failed to read JSON file: {}", args.json_file))?;
 
     let json_commands: JsonCommands =
-        serde_json::from_str(&json_content).context("Failed to parse JSON file")?;
+        serde_json::from_slice(&json_content).context("Failed to parse JSON file")?;
+
+    run_commands(
+        &json_commands,
+        "JSON file",
+        client,
+        dry_run,
+        progress,
+        format,
+        &args.abort_key,
+    )
+}
+
+/// Execute every command of a parsed batch in order and print a summary.
+/// Shared by `from-json` and `from-stdin-json`; `source` names where the
+/// commands came from in verbose output.
+pub(crate) fn run_commands(
+    json_commands: &JsonCommands,
+    source: &str,
+    client: &ConfluenceClient,
+    dry_run: bool,
+    progress: bool,
+    format: OutputFormat,
+    abort_key: &str,
+) -> Result<()> {
+    let verbose = format.is_verbose();
+    let is_structured = format.is_structured();
 
     if let Some(desc) = &json_commands.description {
         if verbose {
@@ -65,100 +96,171 @@ pub fn run(
 
     if verbose {
         ui::print_info(&format!(
-            "Found {} commands in the JSON file.",
-            json_commands.commands.len()
+            "Found {} commands in the {}.",
+            json_commands.commands.len(),
+            source
         ));
     }
 
-    let mut results = ProcessResults::new(json_commands.commands.len());
-
+    // Validate the whole batch before running anything, so a mistake in a
+    // later command doesn't leave the earlier ones already applied
+    let mut ops = Vec::with_capacity(json_commands.commands.len());
+    let mut errors = Vec::new();
     for (i, command) in json_commands.commands.iter().enumerate() {
-        if verbose {
-            ui::print_step(&format!(
-                "Command {}/{}: {} on {}",
-                i + 1,
-                json_commands.commands.len(),
-                command.action.to_uppercase(),
-                command.cql_expression
-            ));
+        match command.to_op(abort_key) {
+            Ok(op) => ops.push(op),
+            Err(e) => errors.push(format!("Command {}: {}", i + 1, e)),
+        }
+    }
+    if !errors.is_empty() {
+        for error in &errors {
+            ui::print_error(error);
         }
+        anyhow::bail!(
+            "{} of {} commands are invalid; no commands were run",
+            errors.len(),
+            json_commands.commands.len()
+        );
+    }
+
+    // A dry run changes nothing, so the searches of all commands can run
+    // up front in parallel instead of one after another
+    if dry_run && ops.len() > 1 {
+        let queries: Vec<_> = ops.iter().map(TagOp::search_cql).collect();
+        client.prefetch_cql_results(&queries, crate::commands::SEARCH_BATCH_SIZE);
+    }
 
-        match process_single_command(command, client, dry_run, progress, format, &args.abort_key) {
-            Ok(_) => {
-                results.processed += 1;
-                results.success += 1;
+    let command_count = ops.len();
+    let outcomes = json_commands
+        .commands
+        .iter()
+        .zip(ops)
+        .enumerate()
+        .filter_map(|(i, (command, op))| {
+            if verbose {
+                ui::print_step(&format!(
+                    "Command {}/{}: {} on {}",
+                    i + 1,
+                    command_count,
+                    op.name(),
+                    command.cql_expression
+                ));
             }
-            Err(e) => {
-                results.processed += 1;
-                results.failed += 1;
-                if verbose || !is_structured {
-                    ui::print_error(&format!("Command failed: {}", e));
+            match op.run(client, dry_run, progress, format) {
+                Ok(command_results) => Some(command_results),
+                Err(e) => {
+                    if verbose || !is_structured {
+                        ui::print_error(&format!("Command failed: {}", e));
+                    }
+                    None
                 }
             }
+        });
+    let results = roll_up(outcomes);
+
+    ui::print_summary(&results, format)
+}
+
+/// Sum the page-level results of each command, in order. Commands run lazily
+/// as the iterator is consumed, so an abort stops the rest of the batch.
+fn roll_up(command_results: impl IntoIterator<Item = ProcessResults>) -> ProcessResults {
+    let mut results = ProcessResults::new(0);
+    for command_results in command_results {
+        let aborted = command_results.aborted;
+        results.merge(command_results);
+        if aborted {
+            break;
         }
     }
-
-    ui::print_summary(&results, format);
-    Ok(())
+    results
 }
 
-pub(crate) fn process_single_command(
-    command: &JsonCommand,
-    client: &ConfluenceClient,
-    dry_run: bool,
-    progress: bool,
-    format: OutputFormat,
-    abort_key: &str,
-) -> Result<()> {
-    match command.action.as_str() {
-        "add" => {
-            let tags_value = command
-                .tags
-                .as_ref()
-                .context("'tags' field required for 'add' action")?;
-            let tags = parse_add_remove_tags(tags_value, "add")?;
+/// A validated batch command, converted to the arguments of its subcommand
+pub(crate) enum TagOp {
+    Add(AddArgs),
+    Remove(RemoveArgs),
+    Replace(ReplaceArgs),
+}
 
-            let add_args = crate::commands::add::AddArgs {
-                cql_expression: command.cql_expression.clone(),
-                tags,
-                interactive: command.interactive,
-                abort_key: abort_key.to_string(),
-            };
-            crate::commands::add::run(add_args, client, dry_run, progress, format)
+impl TagOp {
+    /// Action name as shown in progress output
+    fn name(&self) -> &'static str {
+        match self {
+            TagOp::Add(_) => "ADD",
+            TagOp::Remove(_) => "REMOVE",
+            TagOp::Replace(_) => "REPLACE",
         }
-        "remove" => {
-            let tags_value = command
-                .tags
-                .as_ref()
-                .context("'tags' field required for 'remove' action")?;
-            let tags = parse_add_remove_tags(tags_value, "remove")?;
+    }
 
-            let remove_args = crate::commands::remove::RemoveArgs {
-                cql_expression: command.cql_expression.clone(),
-                tags,
-                interactive: command.interactive,
-                abort_key: abort_key.to_string(),
-                regex: command.regex,
-            };
-            crate::commands::remove::run(remove_args, client, dry_run, progress, format)
+    /// The search this command will run, with its exclusion applied
+    fn search_cql(&self) -> Cow<'_, str> {
+        let (cql, exclude) = match self {
+            TagOp::Add(args) => (&args.cql_expression, &args.cql_exclude),
+            TagOp::Remove(args) => (&args.cql_expression, &args.cql_exclude),
+            TagOp::Replace(args) => (&args.cql_expression, &args.cql_exclude),
+        };
+        ctag::api::exclude_cql(cql, exclude.as_deref())
+    }
+
+    /// Run the command without its own summary; the batch prints one roll-up
+    fn run(
+        self,
+        client: &ConfluenceClient,
+        dry_run: bool,
+        progress: bool,
+        format: OutputFormat,
+    ) -> Result<ProcessResults> {
+        match self {
+            TagOp::Add(args) => {
+                crate::commands::add::run(args, client, dry_run, progress, format, false)
+            }
+            TagOp::Remove(args) => {
+                crate::commands::remove::run(args, client, dry_run, progress, format, false)
+            }
+            TagOp::Replace(args) => {
+                crate::commands::replace::run(args, client, dry_run, progress, format, false)
+            }
         }
-        "replace" => {
-            let tags_value = command
-                .tags
-                .as_ref()
-                .context("'tags' field required for 'replace' action")?;
-            let tag_pairs = parse_replace_tag_pairs(tags_value, command.regex)?;
+    }
+}
 
-            let replace_args = crate::commands::replace::ReplaceArgs {
-                cql_expression: command.cql_expression.clone(),
-                tag_pairs,
-                interactive: command.interactive,
+impl JsonCommand {
+    /// Check the command's fields and convert it to subcommand arguments
+    pub(crate) fn to_op(&self, abort_key: &str) -> Result<TagOp> {
+        // Actions are matched case-insensitively and ignoring surrounding
+        // whitespace, as hand-written batch files are not always consistent
+        let action = self.action.trim().to_ascii_lowercase();
+        let tags = || {
+            self.tags
+                .as_ref()
+                .with_context(|| format!("'tags' field required for '{}' action", action))
+        };
+        match action.as_str() {
+            "add" => Ok(TagOp::Add(AddArgs {
+                cql_expression: self.cql_expression.trim().to_string(),
+                cql_exclude: self.cql_exclude.clone(),
+                tags: parse_add_remove_tags(tags()?, "add")?,
+                interactive: self.interactive,
                 abort_key: abort_key.to_string(),
-                regex: command.regex,
-            };
-            crate::commands::replace::run(replace_args, client, dry_run, progress, format)
+            })),
+            "remove" => Ok(TagOp::Remove(RemoveArgs {
+                cql_expression: self.cql_expression.trim().to_string(),
+                cql_exclude: self.cql_exclude.clone(),
+                tags: parse_add_remove_tags(tags()?, "remove")?,
+                interactive: self.interactive,
+                abort_key: abort_key.to_string(),
+                regex: self.regex,
+            })),
+            "replace" => Ok(TagOp::Replace(ReplaceArgs {
+                cql_expression: self.cql_expression.trim().to_string(),
+                cql_exclude: self.cql_exclude.clone(),
+                tag_pairs: parse_replace_tag_pairs(tags()?, self.regex)?,
+                interactive: self.interactive,
+                abort_key: abort_key.to_string(),
+                regex: self.regex,
+            })),
+            _ => anyhow::bail!("Unknown action: {}", self.action),
         }
-        _ => anyhow::bail!("Unknown action: {}", command.action),
     }
 }
 
@@ -230,6 +332,37 @@ mod tests {
     use super::*;
     use serde_json::json;
 
+    fn command_results(
+        total: usize,
+        success: usize,
+        failed: usize,
+        aborted: bool,
+    ) -> ProcessResults {
+        ProcessResults {
+            processed: success + failed,
+            success,
+            failed,
+            aborted,
+            tags_added: success,
+            ..ProcessResults::new(total)
+        }
+    }
+
+    #[test]
+    fn roll_up_sums_page_counts_and_stops_at_abort() {
+        let results = roll_up([
+            command_results(3, 2, 1, false),
+            command_results(4, 1, 0, true),
+            command_results(5, 5, 0, false),
+        ]);
+        assert_eq!(results.total, 7);
+        assert_eq!(results.processed, 4);
+        assert_eq!(results.success, 3);
+        assert_eq!(results.failed, 1);
+        assert_eq!(results.tags_added, 3);
+        assert!(results.aborted);
+    }
+
     #[test]
     fn parse_add_remove_tags_valid_array() {
         let value = json!(["a", "b"]);
@@ -257,4 +390,41 @@ mod tests {
         assert!(pairs.contains(&"id-[0-9]+".to_string()));
         assert!(pairs.contains(&"matched-id".to_string()));
     }
+
+    #[test]
+    fn to_op_accepts_action_case_and_whitespace() {
+        let command: JsonCommand = serde_json::from_value(json!({
+            "action": " Remove ",
+            "cql_expression": "space = DOCS",
+            "tags": ["a"]
+        }))
+        .unwrap();
+        assert!(matches!(command.to_op("q"), Ok(TagOp::Remove(_))));
+    }
+
+    #[test]
+    fn to_op_rejects_invalid_commands() {
+        let unknown: JsonCommand = serde_json::from_value(json!({
+            "action": "rename",
+            "cql_expression": "space = DOCS",
+            "tags": ["a"]
+        }))
+        .unwrap();
+        assert!(unknown.to_op("q").is_err());
+
+        let missing_tags: JsonCommand = serde_json::from_value(json!({
+            "action": "add",
+            "cql_expression": "space = DOCS"
+        }))
+        .unwrap();
+        assert!(missing_tags.to_op("q").is_err());
+
+        let wrong_shape: JsonCommand = serde_json::from_value(json!({
+            "action": "replace",
+            "cql_expression": "space = DOCS",
+            "tags": ["old", "new"]
+        }))
+        .unwrap();
+        assert!(wrong_shape.to_op("q").is_err());
+    }
 }
@@ -1,9 +1,9 @@
-use crate::commands::from_json::{process_single_command, JsonCommands};
+use crate::commands::from_json::{run_commands, JsonCommands};
 use crate::ui;
 use anyhow::{Context, Result};
 use clap::Args;
 use ctag::api::ConfluenceClient;
-use ctag::models::{OutputFormat, ProcessResults};
+use ctag::models::OutputFormat;
 use std::io::{self, Read};
 
 #[derive(Args)]
@@ -20,68 +20,32 @@ pub fn run(
     progress: bool,
     format: OutputFormat,
 ) -> Result<()> {
-    let verbose = format == OutputFormat::Verbose;
-    let is_structured = format == OutputFormat::Json || format == OutputFormat::Csv;
-
-    if verbose {
+    if format.is_verbose() {
         ui::print_header("EXECUTE FROM STDIN JSON");
     }
 
     // Read from stdin
-    let mut buffer = String::new();
+    let mut buffer = Vec::new();
     io::stdin()
-        .read_to_string(&mut buffer)
+        .lock()
+        .read_to_end(&mut buffer)
         .context("Failed to read from stdin")?;
 
-    if buffer.trim().is_empty() {
+    if buffer.trim_ascii().is_empty() {
         anyhow::bail!("No data provided via stdin. Use a pipe or redirect to provide JSON data.");
     }
 
     // Parse JSON
     let json_commands: JsonCommands =
-        serde_json::from_str(&buffer).context("Failed to parse JSON from stdin")?;
-
-    if let Some(desc) = &json_commands.description {
-        if verbose {
-            ui::print_info(&format!("Description: {}", desc));
-        }
-    }
-
-    if verbose {
-        ui::print_info(&format!(
-            "Found {} commands in the JSON data.",
-            json_commands.commands.len()
-        ));
-    }
-
-    let mut results = ProcessResults::new(json_commands.commands.len());
-
-    for (i, command) in json_commands.commands.iter().enumerate() {
-        if verbose {
-            ui::print_step(&format!(
-                "Command {}/{}: {} on {}",
-                i + 1,
-                json_commands.commands.len(),
-                command.action.to_uppercase(),
-                command.cql_expression
-            ));
-        }
-
-        match process_single_command(command, client, dry_run, progress, format, &args.abort_key) {
-            Ok(_) => {
-                results.processed += 1;
-                results.success += 1;
-            }
-            Err(e) => {
-                results.processed += 1;
-                results.failed += 1;
-                if verbose || !is_structured {
-                    ui::print_error(&format!("Command failed: {}", e));
-                }
-            }
-        }
-    }
-
-    ui::print_summary(&results, format);
-    Ok(())
+        serde_json::from_slice(&buffer).context("Failed to parse JSON from stdin")?;
+
+    run_commands(
+        &json_commands,
+        "JSON data",
+        client,
+        dry_run,
+        progress,
+        format,
+        &args.abort_key,
+    )
 }
@@ -1,5 +1,5 @@
 use crate::ui;
-use anyhow::Result;
+use anyhow::{Context, Result};
 use clap::Args;
 use comfy_table::modifiers::UTF8_ROUND_CORNERS;
 use comfy_table::presets::UTF8_FULL;
@@ -7,7 +7,9 @@ use comfy_table::{Attribute, Cell, Color, Table};
 use ctag::api::{sanitize_text, ConfluenceClient};
 use ctag::models::OutputFormat;
 use serde::Serialize;
-use std::collections::HashSet;
+use std::collections::BTreeSet;
+use std::fs::File;
+use std::io::{self, BufWriter, Write};
 
 #[derive(Args)]
 #[command(after_help = "\
@@ -81,7 +83,7 @@ pub fn run(
     let pages = crate::commands::get_matching_pages(
         client,
         &args.cql_expression,
-        100,
+        crate::commands::SEARCH_BATCH_SIZE,
         format,
         show_progress,
     )?;
@@ -111,6 +113,11 @@ pub fn run(
     use rayon::prelude::*;
     use std::sync::atomic::{AtomicUsize, Ordering};
     let progress_counter = AtomicUsize::new(0);
+    // Only the page ID varies between page URLs
+    let url_prefix = format!(
+        "{}/wiki/pages/viewpage.action?pageId=",
+        client.base_url().trim_end_matches('/')
+    );
     let page_data: Vec<PageData> = pages
         .par_iter()
         .filter_map(|page| {
@@ -118,20 +125,21 @@ pub fn run(
             let page_id = content.id.as_ref()?;
             let title = sanitize_text(page.title.as_deref().unwrap_or("Unknown"));
             let space = page.space_name().to_string();
-            let tags = client.get_page_tags(page_id).unwrap_or_default();
+            // Use the labels that came back with the search when they are
+            // complete; otherwise fetch them for this page
+            let tags = match page.inline_tags() {
+                Some(tags) => tags,
+                None => client.get_page_tags(page_id).unwrap_or_default(),
+            };
             // Extract ancestor titles (they come in order from root to immediate parent)
             let ancestors: Vec<String> = content
                 .ancestors
                 .iter()
-                .filter_map(|a| a.title.clone())
-                .map(|t| sanitize_text(&t))
+                .filter_map(|a| a.title.as_deref())
+                .map(sanitize_text)
                 .collect();
 
-            let url = format!(
-                "{}/wiki/pages/viewpage.action?pageId={}",
-                client.base_url().trim_end_matches('/'),
-                page_id
-            );
+            let url = format!("{}{}", url_prefix, page_id);
 
             // Update progress
             let count = progress_counter.fetch_add(1, Ordering::Relaxed);
@@ -149,30 +157,43 @@ pub fn run(
         })
         .collect();
 
-    let mut all_tags = HashSet::new();
-    for pd in &page_data {
-        all_tags.extend(pd.tags.iter().cloned());
-    }
+    let all_tags = unique_tags(&page_data);
 
     if let Some(p) = &progress {
         p.finish_and_clear();
     }
 
-    // Generate output
-    let output_content = if args.tags_only {
-        format_tags_only(&all_tags, &format)
-    } else {
-        format_page_data(&page_data, &format, args.show_pages, client.base_url())
+    // Write results straight to their destination rather than rendering
+    // the whole document into memory first
+    let mut out: Box<dyn Write> = match &args.output_file {
+        Some(file_path) => Box::new(BufWriter::new(
+            File::create(file_path)
+                .with_context(|| format!("Failed to create output file: {}", file_path))?,
+        )),
+        None => Box::new(io::stdout().lock()),
     };
+    if args.tags_only {
+        write_tags_only(&mut out, &all_tags, &format)?;
+    } else {
+        write_page_data(
+            &mut out,
+            &page_data,
+            &format,
+            args.show_pages,
+            client.base_url(),
+        )?;
+    }
+    // CSV rows already end in a newline
+    if format != OutputFormat::Csv {
+        writeln!(out)?;
+    }
+    out.flush()?;
+    drop(out);
 
-    // Output results
-    if let Some(file_path) = args.output_file {
-        std::fs::write(&file_path, output_content)?;
+    if let Some(file_path) = &args.output_file {
         if verbose {
             ui::print_success(&format!("Results saved to {}", file_path));
         }
-    } else {
-        println!("{}", output_content);
     }
 
     if verbose {
@@ -184,25 +205,28 @@ pub fn run(
     Ok(())
 }
 
-fn format_tags_only(tags: &HashSet<String>, format: &OutputFormat) -> String {
-    let mut sorted_tags: Vec<_> = tags.iter().collect();
-    sorted_tags.sort();
+fn write_tags_only(
+    out: &mut dyn Write,
+    sorted_tags: &BTreeSet<&str>,
+    format: &OutputFormat,
+) -> Result<()> {
     match format {
-        OutputFormat::Json => serde_json::to_string_pretty(&sorted_tags).unwrap_or_default(),
+        OutputFormat::Json => serde_json::to_writer_pretty(out, &sorted_tags)?,
         OutputFormat::Csv => {
-            let mut wtr = csv::Writer::from_writer(vec![]);
+            let mut wtr = csv::Writer::from_writer(out);
             #[derive(Serialize)]
             struct TagCsv<'a> {
                 tag: &'a str,
             }
-            for tag in sorted_tags {
-                wtr.serialize(TagCsv { tag }).unwrap();
+            for &tag in sorted_tags {
+                wtr.serialize(TagCsv { tag })?;
             }
-            String::from_utf8(wtr.into_inner().unwrap()).unwrap()
+            wtr.flush()?;
         }
         OutputFormat::Simple | OutputFormat::Verbose => {
             if sorted_tags.is_empty() {
-                return "No tags found.".to_string();
+                write!(out, "No tags found.")?;
+                return Ok(());
             }
             let mut table = Table::new();
             table
@@ -212,100 +236,69 @@ fn format_tags_only(tags: &HashSet<String>, format: &OutputFormat) -> String {
                     .add_attribute(Attribute::Bold)
                     .fg(Color::Cyan)]);
 
-            for tag in sorted_tags {
+            for &tag in sorted_tags {
                 table.add_row(vec![tag]);
             }
-            table.to_string()
+            write!(out, "{}", table)?;
         }
     }
+    Ok(())
 }
 
 /// Format page data as either a tree view (verbose) or path format (simple).
 /// - Verbose: Shows hierarchical tree structure with ├── └── connectors
 /// - Simple: Shows path format like /Space/Parent/Page [tag1, tag2]
-fn format_page_data(
+fn write_page_data(
+    out: &mut dyn Write,
     page_data: &[PageData],
     format: &OutputFormat,
     show_pages: bool,
     base_url: &str,
-) -> String {
+) -> Result<()> {
+    if page_data.is_empty() && !format.is_structured() {
+        write!(out, "No pages found.")?;
+        return Ok(());
+    }
+    if !show_pages {
+        return write_tags_only(out, &unique_tags(page_data), format);
+    }
     match format {
-        OutputFormat::Json => {
-            if show_pages {
-                serde_json::to_string_pretty(&page_data).unwrap_or_default()
-            } else {
-                let mut all_tags: HashSet<String> = HashSet::new();
-                for page in page_data {
-                    all_tags.extend(page.tags.iter().cloned());
-                }
-                let mut sorted: Vec<_> = all_tags.into_iter().collect();
-                sorted.sort();
-                serde_json::to_string_pretty(&sorted).unwrap_or_default()
-            }
-        }
+        OutputFormat::Json => serde_json::to_writer_pretty(out, &page_data)?,
         OutputFormat::Csv => {
-            let mut wtr = csv::Writer::from_writer(vec![]);
-            if show_pages {
-                #[derive(Serialize)]
-                struct PageDataCsv<'a> {
-                    id: &'a str,
-                    path: String,
-                    space: &'a str,
-                    tags: String,
-                    url: &'a str,
-                }
-
-                for page in page_data {
-                    let path = build_page_path(&page.space, &page.ancestors, &page.title);
-                    wtr.serialize(PageDataCsv {
-                        id: &page.id,
-                        path,
-                        space: &page.space,
-                        tags: page.tags.join(", "),
-                        url: &page.url,
-                    })
-                    .unwrap();
-                }
-            } else {
-                let mut all_tags: HashSet<String> = HashSet::new();
-                for page in page_data {
-                    all_tags.extend(page.tags.iter().cloned());
-                }
-                let mut sorted: Vec<_> = all_tags.into_iter().collect();
-                sorted.sort();
-
-                #[derive(Serialize)]
-                struct TagCsv<'a> {
-                    tag: &'a str,
-                }
-
-                for tag in sorted {
-                    wtr.serialize(TagCsv { tag: &tag }).unwrap();
-                }
-            }
-            String::from_utf8(wtr.into_inner().unwrap()).unwrap()
-        }
-        OutputFormat::Simple => {
-            if page_data.is_empty() {
-                return "No pages found.".to_string();
-            }
-            if show_pages {
-                format_as_paths(page_data, base_url)
-            } else {
-                format_tags_as_table(page_data)
-            }
-        }
-        OutputFormat::Verbose => {
-            if page_data.is_empty() {
-                return "No pages found.".to_string();
+            #[derive(Serialize)]
+            struct PageDataCsv<'a> {
+                id: &'a str,
+                path: String,
+                space: &'a str,
+                tags: String,
+                url: &'a str,
             }
-            if show_pages {
-                format_as_tree(page_data, base_url)
-            } else {
-                format_tags_as_table(page_data)
+
+            let mut wtr = csv::Writer::from_writer(out);
+            for page in page_data {
+                let path = build_page_path(&page.space, &page.ancestors, &page.title);
+                wtr.serialize(PageDataCsv {
+                    id: &page.id,
+                    path,
+                    space: &page.space,
+                    tags: page.tags.join(", "),
+                    url: &page.url,
+                })?;
             }
+            wtr.flush()?;
         }
+        OutputFormat::Simple => write!(out, "{}", format_as_paths(page_data, base_url))?,
+        OutputFormat::Verbose => write!(out, "{}", format_as_tree(page_data, base_url))?,
     }
+    Ok(())
+}
+
+/// Unique tags across all pages, sorted, borrowed from the page data
+fn unique_tags(page_data: &[PageData]) -> BTreeSet<&str> {
+    page_data
+        .iter()
+        .flat_map(|page| page.tags.iter().map(String::as_str))
+        .collect()
 }
 
 // Use shared functions from ui module
@@ -315,22 +308,33 @@ use crate::ui::{
 
 /// Format pages as simple path format: /Space/Parent/Page [tag1, tag2]
 fn format_as_paths(page_data: &[PageData], base_url: &str) -> String {
-    let mut lines: Vec<String> = Vec::new();
-
-    // Sort pages by their full path for consistent output
-    let mut sorted_pages: Vec<_> = page_data.iter().collect();
-    sorted_pages.sort_by(|a, b| {
-        let path_a = build_page_path(&a.space, &a.ancestors, &a.title);
-        let path_b = build_page_path(&b.space, &b.ancestors, &b.title);
-        path_a.cmp(&path_b)
-    });
-    for page in sorted_pages {
-        let path = build_page_path(&page.space, &page.ancestors, &page.title);
+    // Sort pages by their full path for consistent output. Each path is
+    // built once and reused for both the sort key and the output line.
+    let mut sorted_pages: Vec<_> = page_data
+        .iter()
+        .map(|page| {
+            (
+                build_page_path(&page.space, &page.ancestors, &page.title),
+                page,
+            )
+        })
+        .collect();
+    sorted_pages.sort_by(|(path_a, _), (path_b, _)| path_a.cmp(path_b));
+    let mut output = String::new();
+    for (path, page) in sorted_pages {
         let tags = format_tags_list(&page.tags);
         let clickable_path = make_page_clickable(&path, &page.id, base_url);
-        lines.push(format!("{} {}", clickable_path, tags));
+        push_line(&mut output, &format!("{} {}", clickable_path, tags));
+    }
+    output
+}
+
+/// Append a line to `output`, separating it from any previous line
+fn push_line(output: &mut String, line: &str) {
+    if !output.is_empty() {
+        output.push('\n');
     }
-    lines.join("\n")
+    output.push_str(line);
 }
 
 /// Format pages as a tree structure similar to the `tree` command
@@ -369,8 +373,8 @@ fn format_as_tree(page_data: &[PageData], base_url: &str) -> String {
         prefix: &str,
         base_url: &str,
         is_root: bool,
-    ) -> Vec<String> {
-        let mut lines = Vec::new();
+        output: &mut String,
+    ) {
         let entries: Vec<_> = node.iter().collect();
         let count = entries.len();
 
@@ -402,85 +406,62 @@ fn format_as_tree(page_data: &[PageData], base_url: &str) -> String {
                 format!("{}{}{}", prefix, connector, format_directory(name))
             };
 
-            lines.push(display_name);
+            push_line(output, &display_name);
 
             // Recurse into children
             if !child.children.is_empty() {
-                lines.extend(render_tree(&child.children, &child_prefix, base_url, false));
+                render_tree(&child.children, &child_prefix, base_url, false, output);
             }
         }
-
-        lines
     }
 
     // Render each space as a root
-    let mut all_lines = Vec::new();
+    let mut output = String::new();
     let spaces: Vec<_> = root.iter().collect();
     let space_count = spaces.len();
 
     for (i, (space_name, space_node)) in spaces.iter().enumerate() {
         // Space header with color
-        all_lines.push(format_space(space_name));
+        push_line(&mut output, &format_space(space_name));
 
         // Render children of this space
         let is_last_space = i == space_count - 1;
         let _ = is_last_space; // We don't need different prefix for last space
-        all_lines.extend(render_tree(&space_node.children, "", base_url, false));
+        render_tree(&space_node.children, "", base_url, false, &mut output);
 
         // Add blank line between spaces (except after last)
         if i < space_count - 1 {
-            all_lines.push(String::new());
+            push_line(&mut output, "");
         }
     }
 
-    all_lines.join("\n")
-}
-
-/// Format tags only as a table (when show_pages is false)
-fn format_tags_as_table(page_data: &[PageData]) -> String {
-    let mut all_tags: HashSet<String> = HashSet::new();
-    for page in page_data {
-        all_tags.extend(page.tags.iter().cloned());
-    }
-
-    if all_tags.is_empty() {
-        "No tags found.".to_string()
-    } else {
-        let mut table = Table::new();
-        table
-            .load_preset(UTF8_FULL)
-            .apply_modifier(UTF8_ROUND_CORNERS)
-            .set_header(vec![Cell::new("Tag")
-                .add_attribute(Attribute::Bold)
-                .fg(Color::Cyan)]);
-
-        let mut sorted: Vec<_> = all_tags.into_iter().collect();
-        sorted.sort();
-        for tag in sorted {
-            table.add_row(vec![tag]);
-        }
-        table.to_string()
-    }
+    output
 }
 
 #[cfg(test)]
 mod tests {
     use super::*;
-    use std::collections::HashSet;
+
+    /// Run one of the writer-based formatters into a String
+    fn render(write: impl FnOnce(&mut dyn Write) -> Result<()>) -> String {
+        let mut buf = Vec::new();
+        write(&mut buf).unwrap();
+        String::from_utf8(buf).unwrap()
+    }
 
     #[test]
     fn format_tags_only_table_empty() {
-        let tags: HashSet<String> = HashSet::new();
-        let out = format_tags_only(&tags, &OutputFormat::Simple);
+        let tags: BTreeSet<&str> = BTreeSet::new();
+        let out = render(|w| write_tags_only(w, &tags, &OutputFormat::Simple));
         assert_eq!(out.trim(), "No tags found.");
     }
 
     #[test]
     fn format_tags_only_json_sorted() {
-        let mut tags: HashSet<String> = HashSet::new();
-        tags.insert("b".to_string());
-        tags.insert("a".to_string());
-        let out = format_tags_only(&tags, &OutputFormat::Json);
+        let mut tags: BTreeSet<&str> = BTreeSet::new();
+        tags.insert("b");
+        tags.insert("a");
+        let out = render(|w| write_tags_only(w, &tags, &OutputFormat::Json));
         let parsed: Vec<String> = serde_json::from_str(&out).unwrap();
         assert_eq!(parsed, vec!["a".to_string(), "b".to_string()]);
     }
@@ -610,7 +591,15 @@ mod tests {
             ancestors: vec!["Level1".to_string(), "Level2".to_string()],
             url: "http://example.com/123".to_string(),
         }];
-        let output = format_page_data(&pages, &OutputFormat::Simple, true, "https://example.com");
+        let output = render(|w| {
+            write_page_data(
+                w,
+                &pages,
+                &OutputFormat::Simple,
+                true,
+                "https://example.com",
+            )
+        });
         // Simple mode should show path format
         assert!(output.contains("/MYSPACE/Level1/Level2/DeepPage"));
         assert!(output.contains("[important]"));
@@ -626,7 +615,9 @@ mod tests {
             ancestors: vec!["Parent".to_string()],
             url: "http://example.com/123".to_string(),
         }];
-        let output = format_page_data(&pages, &OutputFormat::Json, true, "https://example.com");
+        let output = render(|w| {
+            write_page_data(w, &pages, &OutputFormat::Json, true, "https://example.com")
+        });
         let parsed: Vec<serde_json::Value> = serde_json::from_str(&output).unwrap();
         assert_eq!(parsed.len(), 1);
         assert_eq!(parsed[0]["ancestors"][0], "Parent");
@@ -642,7 +633,8 @@ mod tests {
             ancestors: vec!["Parent".to_string()],
             url: "http://example.com/123".to_string(),
         }];
-        let output = format_page_data(&pages, &OutputFormat::Csv, true, "https://example.com");
+        let output =
+            render(|w| write_page_data(w, &pages, &OutputFormat::Csv, true, "https://example.com"));
         // CSV should have path column
         assert!(output.contains("/MYSPACE/Parent/TestPage"));
     }
@@ -8,7 +8,14 @@ pub mod replace;
 use crate::ui;
 use anyhow::Result;
 use ctag::api::ConfluenceClient;
-use ctag::models::{OutputFormat, SearchResultItem};
+use ctag::models::{OutputFormat, ProcessResults, SearchResultItem};
+use std::borrow::Cow;
+use std::sync::Arc;
+
+pub use ctag::ops::ActionResult;
+
+/// Number of results requested per page of a CQL search
+pub const SEARCH_BATCH_SIZE: usize = 100;
 
 /// Shared logic to fetch pages with a spinner progress matching various settings
 pub fn get_matching_pages(
@@ -17,7 +24,7 @@ pub fn get_matching_pages(
     limit: usize,
     format: OutputFormat,
     show_progress: bool,
-) -> Result<Vec<SearchResultItem>> {
+) -> Result<Arc<[SearchResultItem]>> {
     let verbose = format.is_verbose();
     let is_structured = format.is_structured();
 
@@ -49,84 +56,130 @@ pub fn get_matching_pages(
     Ok(pages)
 }
 
-pub enum ActionResult {
-    Success {
-        added: usize,
-        removed: usize,
-        detail: Option<ctag::models::ActionDetail>,
-    },
-    Failed,
-    Skipped,
+/// Fetch the pages a tag command will change and report how many matched.
+/// An empty result has already been reported to the user.
+pub fn find_target_pages(
+    client: &ConfluenceClient,
+    cql: &str,
+    cql_exclude: Option<&str>,
+    dry_run: bool,
+    format: OutputFormat,
+    show_progress: bool,
+) -> Result<Arc<[SearchResultItem]>> {
+    let cql = ctag::api::exclude_cql(cql, cql_exclude);
+    let pages = get_matching_pages(client, &cql, SEARCH_BATCH_SIZE, format, show_progress)?;
+    if pages.is_empty() {
+        ui::print_warning("No pages found matching the CQL expression.");
+        if dry_run {
+            ui::print_dry_run("No changes will be made.");
+        }
+    } else if format.is_verbose() {
+        ui::print_info(&format!("Found {} matching pages.", pages.len()));
+    }
+    Ok(pages)
 }
 
-/// Shared logic for processing pages in parallel with progress bar
-pub fn process_pages_parallel<F>(
+/// Fetch the current tags of every page concurrently, in page order.
+/// Pages without an ID yield `None`.
+pub fn fetch_page_tags(
+    client: &ConfluenceClient,
     pages: &[SearchResultItem],
-    show_progress: bool,
-    action: F,
-) -> ctag::models::ProcessResults
-where
-    F: Fn(&SearchResultItem) -> ActionResult + Sync + Send,
-{
+) -> Result<Vec<Option<Vec<String>>>> {
     use rayon::prelude::*;
-    use std::sync::atomic::{AtomicUsize, Ordering};
-    use std::sync::Mutex;
 
-    let progress = if show_progress {
-        Some(ui::create_progress_bar(pages.len() as u64))
-    } else {
-        None
-    };
+    pages
+        .par_iter()
+        .map(|page| {
+            page.page_id()
+                .map(|id| client.get_page_tags(id))
+                .transpose()
+        })
+        .collect()
+}
 
-    let success_count = AtomicUsize::new(0);
-    let failed_count = AtomicUsize::new(0);
-    let skipped_count = AtomicUsize::new(0);
-    let added_count = AtomicUsize::new(0);
-    let removed_count = AtomicUsize::new(0);
-    let details = Mutex::new(Vec::new());
-
-    pages.par_iter().for_each(|page| {
-        match action(page) {
-            ActionResult::Success {
-                added,
-                removed,
-                detail,
-            } => {
-                success_count.fetch_add(1, Ordering::Relaxed);
-                added_count.fetch_add(added, Ordering::Relaxed);
-                removed_count.fetch_add(removed, Ordering::Relaxed);
-                if let Some(d) = detail {
-                    if let Ok(mut g) = details.lock() {
-                        g.push(d);
-                    }
-                }
+/// A change proposed to the user for one page in interactive mode
+pub struct PlannedChange<'a, T> {
+    pub change: T,
+    /// Lines listed under the page heading
+    pub substeps: Cow<'a, [String]>,
+    pub prompt: Cow<'a, str>,
+}
+
+/// Process pages one at a time, asking before each change.
+/// `plan` proposes a change for a page ID, or `None` to skip the page, and
+/// `apply` makes it once confirmed. Declining skips the page; cancelling
+/// the prompt aborts the remaining pages.
+pub fn process_pages_interactive<'a, T>(
+    client: &ConfluenceClient,
+    pages: &[SearchResultItem],
+    show_progress: bool,
+    action: &str,
+    mut plan: impl FnMut(&str) -> Result<Option<PlannedChange<'a, T>>>,
+    mut apply: impl FnMut(&str, &T) -> ActionResult,
+) -> Result<ProcessResults> {
+    let progress = show_progress.then(|| ui::create_progress_bar(pages.len() as u64));
+    let mut results = ProcessResults::new(pages.len());
+    for page in pages {
+        let planned = match page.page_id() {
+            Some(page_id) => plan(page_id)?.map(|planned| (page_id, planned)),
+            None => None,
+        };
+        let Some((page_id, planned)) = planned else {
+            results.skipped += 1;
+            if let Some(pb) = &progress {
+                pb.inc(1);
             }
-            ActionResult::Failed => {
-                failed_count.fetch_add(1, Ordering::Relaxed);
+            continue;
+        };
+
+        let display_title = page.printable_clickable_title(client.base_url());
+        let print_action = || {
+            ui::print_page_action(action, &display_title, page.space_name());
+            ui::print_substeps(&planned.substeps);
+        };
+        if let Some(pb) = &progress {
+            pb.suspend(print_action);
+        } else {
+            print_action();
+        }
+
+        match ui::confirm(&planned.prompt, progress.as_ref()) {
+            Ok(true) => {
+                results.processed += 1;
+                apply(page_id, &planned.change).record(&mut results);
             }
-            ActionResult::Skipped => {
-                skipped_count.fetch_add(1, Ordering::Relaxed);
+            Ok(false) => results.skipped += 1,
+            Err(_) => {
+                results.aborted = true;
+                break;
             }
         }
-
-        if let Some(ref p) = progress {
-            p.inc(1);
+        if let Some(pb) = &progress {
+            pb.inc(1);
         }
-    });
-
-    if let Some(ref p) = progress {
-        p.finish_with_message("Done");
     }
-
-    ctag::models::ProcessResults {
-        total: pages.len(),
-        processed: pages.len(),
-        skipped: skipped_count.load(Ordering::Relaxed),
-        success: success_count.load(Ordering::Relaxed),
-        failed: failed_count.load(Ordering::Relaxed),
-        aborted: false,
-        tags_added: added_count.load(Ordering::Relaxed),
-        tags_removed: removed_count.load(Ordering::Relaxed),
-        details: details.into_inner().unwrap_or_default(),
+    if let Some(pb) = progress {
+        pb.finish_with_message("Done");
     }
+    Ok(results)
+}
+
+/// Process pages in parallel with ctag::ops, showing a progress bar if requested
+pub fn process_pages_parallel<F>(
+    pages: &[SearchResultItem],
+    show_progress: bool,
+    action: F,
+) -> ctag::models::ProcessResults
+where
+    F: Fn(&SearchResultItem) -> ActionResult + Sync + Send,
+{
+    let progress =
+        show_progress.then(|| ui::BarReporter(ui::create_progress_bar(pages.len() as u64)));
+    ctag::ops::process_pages_parallel(
+        pages,
+        progress
+            .as_ref()
+            .map(|p| p as &dyn ctag::ops::ProgressReporter),
+        action,
+    )
 }
@@ -5,7 +5,8 @@ use colored::Colorize;
 use ctag::api::ConfluenceClient;
 use ctag::models::sanitize_text;
 use ctag::models::ProcessResults;
-use dialoguer::Confirm;
+use std::borrow::Cow;
+use std::io::{self, BufWriter, Write};
 
 #[derive(Args)]
 #[command(after_help = "\
@@ -29,6 +30,10 @@ pub struct RemoveArgs {
     /// CQL expression to match pages
     pub cql_expression: String,
 
+    /// CQL expression matching pages to leave untouched
+    #[arg(long)]
+    pub cql_exclude: Option<String>,
+
     /// Tags to remove
     #[arg(required = true)]
     pub tags: Vec<String>,
@@ -46,13 +51,20 @@ pub struct RemoveArgs {
     pub regex: bool,
 }
 
+fn removal_substeps(tags: &[String]) -> Vec<String> {
+    tags.iter()
+        .map(|tag| format!("{}: {}", "Remove".red(), tag))
+        .collect()
+}
+
 pub fn run(
     args: RemoveArgs,
     client: &ConfluenceClient,
     dry_run: bool,
     show_progress: bool,
     format: ctag::models::OutputFormat,
-) -> Result<()> {
+    show_summary: bool,
+) -> Result<ProcessResults> {
     let verbose = format.is_verbose();
 
     let compiled_regexes = if args.regex {
@@ -72,47 +84,53 @@ pub fn run(
         ui::print_header("REMOVE TAGS");
     }
 
-    // Get matching pages
-    let pages = crate::commands::get_matching_pages(
+    let pages = crate::commands::find_target_pages(
         client,
         &args.cql_expression,
-        100,
+        args.cql_exclude.as_deref(),
+        dry_run,
         format,
         show_progress,
     )?;
-
     if pages.is_empty() {
-        ui::print_warning("No pages found matching the CQL expression.");
-        if dry_run {
-            ui::print_dry_run("No changes will be made.");
-        }
-        return Ok(());
+        return Ok(ProcessResults::new(0));
     }
 
-    if verbose {
-        ui::print_info(&format!("Found {} matching pages.", pages.len()));
-    }
+    // Without regexes every page gets the same tag lines, so render them once
+    let fixed_substeps = compiled_regexes
+        .is_none()
+        .then(|| removal_substeps(&args.tags));
 
     if dry_run {
         ui::print_dry_run("No changes will be made.");
-        for page in &pages {
-            let page_id = match page.page_id() {
-                Some(id) => id,
-                None => continue,
-            };
+        // Regex matching needs every page's current tags; fetch them up front
+        // in parallel instead of one request at a time while printing
+        let current_tags = if compiled_regexes.is_some() {
+            crate::commands::fetch_page_tags(client, &pages)?
+        } else {
+            vec![None; pages.len()]
+        };
+        let mut out = BufWriter::new(io::stderr().lock());
+        for (page, current_tags) in pages.iter().zip(current_tags) {
+            if page.page_id().is_none() {
+                continue;
+            }
 
             let title = page.title.as_deref().unwrap_or("Unknown");
             let space = page.space_name();
 
             let tags_to_remove = if let Some(regexes) = &compiled_regexes {
-                let current_tags = client.get_page_tags(page_id)?;
-                ctag::api::filter_tags_by_regex(current_tags, regexes)
+                Cow::Owned(ctag::api::filter_tags_by_regex(
+                    current_tags.unwrap_or_default(),
+                    regexes,
+                ))
             } else {
-                args.tags.clone()
+                Cow::Borrowed(args.tags.as_slice())
             };
 
             if tags_to_remove.is_empty() && args.regex {
                 if verbose {
+                    out.flush()?;
                     ui::print_info(&format!(
                         "Skipping page '{}' - no tags match regex",
                         sanitize_text(title)
@@ -122,118 +140,79 @@ pub fn run(
             }
 
             let display_title = page.printable_clickable_title(client.base_url());
-            ui::print_page_action("Would remove tags from", &display_title, space);
-            for tag in &tags_to_remove {
-                ui::print_substep(&format!("{}: {}", "Remove".red(), tag));
-            }
+            let substeps = match &fixed_substeps {
+                Some(lines) => Cow::Borrowed(lines),
+                None => Cow::Owned(removal_substeps(&tags_to_remove)),
+            };
+            ui::write_page_action(
+                &mut out,
+                "Would remove tags from",
+                &display_title,
+                space,
+                &substeps,
+            )?;
         }
-        return Ok(());
+        out.flush()?;
+        return Ok(ProcessResults::new(pages.len()));
     }
 
     // Process the pages
-    let mut results = ProcessResults::new(pages.len());
-
-    if args.interactive {
+    let results = if args.interactive {
         // Interactive mode: sequential processing
-        let progress = if show_progress {
-            Some(ui::create_progress_bar(pages.len() as u64))
-        } else {
-            None
-        };
-
-        for page in &pages {
-            let page_id = match page.page_id() {
-                Some(id) => id,
-                None => {
-                    results.skipped += 1;
-                    continue;
-                }
-            };
-
-            let space = page.space_name();
-
-            let tags_to_remove = if let Some(regexes) = &compiled_regexes {
-                let current_tags = client.get_page_tags(page_id)?;
-                ctag::api::filter_tags_by_regex(current_tags, regexes)
-            } else {
-                args.tags.clone()
-            };
-
-            if tags_to_remove.is_empty() && args.regex {
-                results.skipped += 1;
-                if let Some(pb) = &progress {
-                    pb.inc(1);
-                }
-                continue;
-            }
-
-            let display_title = page.printable_clickable_title(client.base_url());
-            if let Some(pb) = &progress {
-                pb.suspend(|| {
-                    ui::print_page_action("Removing tags from", &display_title, space);
-                    for tag in &tags_to_remove {
-                        ui::print_substep(&format!("{}: {}", "Remove".red(), tag));
-                    }
-                });
-            } else {
-                ui::print_page_action("Removing tags from", &display_title, space);
-                for tag in &tags_to_remove {
-                    ui::print_substep(&format!("{}: {}", "Remove".red(), tag));
+        crate::commands::process_pages_interactive(
+            client,
+            &pages,
+            show_progress,
+            "Removing tags from",
+            |page_id| {
+                let tags_to_remove = if let Some(regexes) = &compiled_regexes {
+                    let current_tags = client.get_page_tags(page_id)?;
+                    Cow::Owned(ctag::api::filter_tags_by_regex(current_tags, regexes))
+                } else {
+                    Cow::Borrowed(args.tags.as_slice())
+                };
+                if tags_to_remove.is_empty() && args.regex {
+                    return Ok(None);
                 }
-            }
-
-            let prompt = format!(
-                "Remove tags {:?}? (Enter '{}' to abort)",
-                tags_to_remove, args.abort_key
-            );
-
-            let confirmed = if let Some(pb) = &progress {
-                pb.suspend(|| Confirm::new().with_prompt(&prompt).interact())
-            } else {
-                Confirm::new().with_prompt(&prompt).interact()
-            };
-
-            match confirmed {
-                Ok(true) => {}
-                Ok(false) => {
-                    results.skipped += 1;
-                    if let Some(pb) = &progress {
-                        pb.inc(1);
+                let substeps = match &fixed_substeps {
+                    Some(lines) => Cow::Borrowed(lines.as_slice()),
+                    None => Cow::Owned(removal_substeps(&tags_to_remove)),
+                };
+                let prompt = format!(
+                    "Remove tags {:?}? (Enter '{}' to abort)",
+                    tags_to_remove, args.abort_key
+                );
+                Ok(Some(crate::commands::PlannedChange {
+                    change: tags_to_remove,
+                    substeps,
+                    prompt: Cow::Owned(prompt),
+                }))
+            },
+            |page_id, tags_to_remove| {
+                if client.remove_tags(page_id, tags_to_remove) {
+                    crate::commands::ActionResult::Success {
+                        added: 0,
+                        removed: tags_to_remove.len(),
+                        detail: None,
                     }
-                    continue;
-                }
-                Err(_) => {
-                    results.aborted = true;
-                    break;
+                } else {
+                    crate::commands::ActionResult::Failed
                 }
-            }
-            let success = client.remove_tags(page_id, &tags_to_remove);
-            results.processed += 1;
-            if success {
-                results.success += 1;
-                results.tags_removed += tags_to_remove.len();
-            } else {
-                results.failed += 1;
-            }
-            if let Some(pb) = &progress {
-                pb.inc(1);
-            }
-        }
-        if let Some(pb) = progress {
-            pb.finish_with_message("Done");
-        }
+            },
+        )?
     } else {
         // Non-interactive mode: parallel processing
-        results = crate::commands::process_pages_parallel(&pages, show_progress, |page| {
+        let record_details = format == ctag::models::OutputFormat::Json;
+        crate::commands::process_pages_parallel(&pages, show_progress, |page| {
             let page_id = match page.page_id() {
                 Some(id) => id,
                 None => return crate::commands::ActionResult::Skipped,
             };
             let tags_to_remove = if let Some(regexes) = &compiled_regexes {
                 let current_tags = client.get_page_tags(page_id).unwrap_or_default();
-                ctag::api::filter_tags_by_regex(current_tags, regexes)
+                Cow::Owned(ctag::api::filter_tags_by_regex(current_tags, regexes))
             } else {
-                args.tags.clone()
+                Cow::Borrowed(args.tags.as_slice())
             };
 
             if tags_to_remove.is_empty() && args.regex {
@@ -241,24 +220,26 @@ pub fn run(
             }
 
             if client.remove_tags(page_id, &tags_to_remove) {
-                let detail = ctag::models::ActionDetail {
-                    page_id: page_id.to_string(),
-                    title: page.title.as_deref().unwrap_or("Unknown").to_string(),
-                    space: page.space_name().to_string(),
-                    url: page.printable_clickable_title(client.base_url()),
-                    tags_added: vec![],
-                    tags_removed: tags_to_remove.clone(),
-                };
+                let detail = record_details.then(|| {
+                    ctag::models::ActionDetail::new(
+                        page,
+                        client.base_url(),
+                        vec![],
+                        tags_to_remove.to_vec(),
+                    )
+                });
                 crate::commands::ActionResult::Success {
                     added: 0,
                     removed: tags_to_remove.len(),
-                    detail: Some(detail),
+                    detail,
                 }
             } else {
                 crate::commands::ActionResult::Failed
             }
-        });
+        })
+    };
+    if show_summary {
+        ui::print_summary(&results, format)?;
     }
-    ui::print_summary(&results, format);
-    Ok(())
+    Ok(results)
 }
@@ -5,8 +5,9 @@ use colored::Colorize;
 use ctag::api::ConfluenceClient;
 use ctag::models::sanitize_text;
 use ctag::models::ProcessResults;
-use dialoguer::Confirm;
+use std::borrow::Cow;
 use std::collections::HashMap;
+use std::io::{self, BufWriter, Write};
 
 #[derive(Args)]
 #[command(after_help = "\
@@ -32,6 +33,10 @@ pub struct ReplaceArgs {
     /// CQL expression to match pages
     pub cql_expression: String,
 
+    /// CQL expression matching pages to leave untouched
+    #[arg(long)]
+    pub cql_exclude: Option<String>,
+
     /// Tag pairs to replace
     /// - Without --regex: use 'old=new' format (e.g., 'foo=bar' 'baz=qux')
     /// - With --regex: use positional pairs (e.g., 'pattern1' 'replacement1' 'pattern2' 'replacement2')
@@ -71,20 +76,18 @@ pub(crate) fn parse_tag_pairs(pairs: &[String], regex: bool) -> Result<HashMap<S
             if old.is_empty() || new.is_empty() {
                 anyhow::bail!("Invalid tag pair: old pattern and new tag must be non-empty");
             }
-            tag_mapping.insert(old.to_string(), new.to_string());
+            insert_tag_pair(&mut tag_mapping, old, new);
         }
     } else {
         // Traditional old=new format for non-regex mode
         for pair in pairs {
-            let parts: Vec<&str> = pair.splitn(2, '=').collect();
-            if parts.len() != 2 {
+            let Some((old, new)) = pair.split_once('=') else {
                 anyhow::bail!(
                     "Invalid tag pair format: '{}'. Use format 'oldtag=newtag'",
                     pair
                 );
-            }
-            let old = parts[0].trim();
-            let new = parts[1].trim();
+            };
+            let (old, new) = (old.trim(), new.trim());
 
             if old.is_empty() || new.is_empty() {
                 anyhow::bail!(
@@ -93,20 +96,48 @@ pub(crate) fn parse_tag_pairs(pairs: &[String], regex: bool) -> Result<HashMap<S
                 );
             }
 
-            tag_mapping.insert(old.to_string(), new.to_string());
+            insert_tag_pair(&mut tag_mapping, old, new);
         }
     }
 
     Ok(tag_mapping)
 }
 
+/// Record `old` -> `new`, warning when an earlier pair for `old` is overridden
+fn insert_tag_pair(tag_mapping: &mut HashMap<String, String>, old: &str, new: &str) {
+    if let Some(previous) = tag_mapping.insert(old.to_string(), new.to_string()) {
+        if previous != new {
+            ui::print_warning(&format!(
+                "Tag '{}' is given more than once; replacing it with '{}' instead of '{}'",
+                old, new, previous
+            ));
+        }
+    }
+}
+
+fn replacement_substeps(replacements: &HashMap<String, String>) -> Vec<String> {
+    replacements
+        .iter()
+        .map(|(old, new)| {
+            format!(
+                "{}: {} {} {}",
+                "Replace".yellow(),
+                old.dimmed(),
+                "→".bright_black(),
+                new.green()
+            )
+        })
+        .collect()
+}
+
 pub fn run(
     args: ReplaceArgs,
     client: &ConfluenceClient,
     dry_run: bool,
     show_progress: bool,
     format: ctag::models::OutputFormat,
-) -> Result<()> {
+    show_summary: bool,
+) -> Result<ProcessResults> {
     let verbose = format.is_verbose();
     if verbose {
         ui::print_header("REPLACE TAGS");
@@ -127,43 +158,49 @@ pub fn run(
         None
     };
 
-    // Get matching pages
-    let pages = crate::commands::get_matching_pages(
+    let pages = crate::commands::find_target_pages(
         client,
         &args.cql_expression,
-        100,
+        args.cql_exclude.as_deref(),
+        dry_run,
         format,
         show_progress,
     )?;
-
     if pages.is_empty() {
-        ui::print_warning("No pages found matching the CQL expression.");
-        if dry_run {
-            ui::print_dry_run("No changes will be made.");
-        }
-        return Ok(());
-    }
-    if verbose {
-        ui::print_info(&format!("Found {} matching pages.", pages.len()));
+        return Ok(ProcessResults::new(0));
     }
+    // Without regexes every page gets the same replacement lines, so render them once
+    let fixed_substeps = compiled_regexes
+        .is_none()
+        .then(|| replacement_substeps(&tag_mapping));
+
     if dry_run {
         ui::print_dry_run("No changes will be made.");
-        for page in &pages {
-            let page_id = match page.page_id() {
-                Some(id) => id,
-                None => continue,
-            };
+        // Fetch current tags for regex matching concurrently, see remove.rs
+        let current_tags = if compiled_regexes.is_some() {
+            crate::commands::fetch_page_tags(client, &pages)?
+        } else {
+            vec![None; pages.len()]
+        };
+        let mut out = BufWriter::new(io::stderr().lock());
+        for (page, current_tags) in pages.iter().zip(current_tags) {
+            if page.page_id().is_none() {
+                continue;
+            }
             let title = page.title.as_deref().unwrap_or("Unknown");
             let space = page.space_name();
             let replacements = if let Some(regex_pairs) = &compiled_regexes {
-                let current_tags = client.get_page_tags(page_id)?;
-                ctag::api::compute_replacements_by_regex(current_tags, regex_pairs)
+                Cow::Owned(ctag::api::compute_replacements_by_regex(
+                    current_tags.unwrap_or_default(),
+                    regex_pairs,
+                ))
             } else {
-                tag_mapping.clone()
+                Cow::Borrowed(&tag_mapping)
             };
 
             if replacements.is_empty() && args.regex {
                 if verbose {
+                    out.flush()?;
                     ui::print_info(&format!(
                         "Skipping page '{}' - no tags match regex",
                         sanitize_text(title)
@@ -173,122 +210,75 @@ pub fn run(
             }
 
             let display_title = page.printable_clickable_title(client.base_url());
-            ui::print_page_action("Would replace tags on", &display_title, space);
-            for (old, new) in &replacements {
-                ui::print_substep(&format!(
-                    "{}: {} {} {}",
-                    "Replace".yellow(),
-                    old.dimmed(),
-                    "→".bright_black(),
-                    new.green()
-                ));
-            }
+            let substeps = match &fixed_substeps {
+                Some(lines) => Cow::Borrowed(lines),
+                None => Cow::Owned(replacement_substeps(&replacements)),
+            };
+            ui::write_page_action(
+                &mut out,
+                "Would replace tags on",
+                &display_title,
+                space,
+                &substeps,
+            )?;
         }
-        return Ok(());
+        out.flush()?;
+        return Ok(ProcessResults::new(pages.len()));
     }
     // Process the pages
-    let mut results = ProcessResults::new(pages.len());
-    if args.interactive {
+    let results = if args.interactive {
         // Interactive mode: sequential processing
-        let progress = if show_progress {
-            Some(ui::create_progress_bar(pages.len() as u64))
-        } else {
-            None
-        };
-        for page in &pages {
-            let page_id = match page.page_id() {
-                Some(id) => id,
-                None => {
-                    results.skipped += 1;
-                    continue;
-                }
-            };
-
-            let space = page.space_name();
-            let replacements = if let Some(regex_pairs) = &compiled_regexes {
-                let current_tags = client.get_page_tags(page_id)?;
-                ctag::api::compute_replacements_by_regex(current_tags, regex_pairs)
-            } else {
-                tag_mapping.clone()
-            };
-            if replacements.is_empty() && args.regex {
-                results.skipped += 1;
-                if let Some(pb) = &progress {
-                    pb.inc(1);
-                }
-                continue;
-            }
-            let display_title = page.printable_clickable_title(client.base_url());
-            if let Some(pb) = &progress {
-                pb.suspend(|| {
-                    ui::print_page_action("Replacing tags on", &display_title, space);
-                    for (old, new) in &replacements {
-                        ui::print_substep(&format!(
-                            "{}: {} {} {}",
-                            "Replace".yellow(),
-                            old.dimmed(),
-                            "→".bright_black(),
-                            new.green()
-                        ));
-                    }
-                });
-            } else {
-                ui::print_page_action("Replacing tags on", &display_title, space);
-                for (old, new) in &replacements {
-                    ui::print_substep(&format!(
-                        "{}: {} {} {}",
-                        "Replace".yellow(),
-                        old.dimmed(),
-                        "→".bright_black(),
-                        new.green()
-                    ));
+        crate::commands::process_pages_interactive(
+            client,
+            &pages,
+            show_progress,
+            "Replacing tags on",
+            |page_id| {
+                let replacements = if let Some(regex_pairs) = &compiled_regexes {
+                    let current_tags = client.get_page_tags(page_id)?;
+                    Cow::Owned(ctag::api::compute_replacements_by_regex(
+                        current_tags,
+                        regex_pairs,
+                    ))
+                } else {
+                    Cow::Borrowed(&tag_mapping)
+                };
+                if replacements.is_empty() && args.regex {
+                    return Ok(None);
                 }
-            }
-            let old_tags: Vec<_> = replacements.keys().collect();
-            let new_tags: Vec<_> = replacements.values().collect();
-            let prompt = format!(
-                "Replace tags {:?} with {:?}? (Enter '{}' to abort)",
-                old_tags, new_tags, args.abort_key
-            );
-            let confirmed = if let Some(pb) = &progress {
-                pb.suspend(|| Confirm::new().with_prompt(&prompt).interact())
-            } else {
-                Confirm::new().with_prompt(&prompt).interact()
-            };
-            match confirmed {
-                Ok(true) => {}
-                Ok(false) => {
-                    results.skipped += 1;
-                    if let Some(pb) = &progress {
-                        pb.inc(1);
+                let substeps = match &fixed_substeps {
+                    Some(lines) => Cow::Borrowed(lines.as_slice()),
+                    None => Cow::Owned(replacement_substeps(&replacements)),
+                };
+                let old_tags: Vec<_> = replacements.keys().collect();
+                let new_tags: Vec<_> = replacements.values().collect();
+                let prompt = format!(
+                    "Replace tags {:?} with {:?}? (Enter '{}' to abort)",
+                    old_tags, new_tags, args.abort_key
+                );
+                Ok(Some(crate::commands::PlannedChange {
+                    change: replacements,
+                    substeps,
+                    prompt: Cow::Owned(prompt),
+                }))
+            },
+            |page_id, replacements| {
+                if client.replace_tags(page_id, replacements) {
+                    use std::collections::HashSet;
+                    crate::commands::ActionResult::Success {
+                        added: replacements.values().collect::<HashSet<_>>().len(),
+                        removed: replacements.len(),
+                        detail: None,
                     }
-                    continue;
-                }
-                Err(_) => {
-                    results.aborted = true;
-                    break;
+                } else {
+                    crate::commands::ActionResult::Failed
                 }
-            }
-            let success = client.replace_tags(page_id, &replacements);
-            results.processed += 1;
-            if success {
-                results.success += 1;
-                use std::collections::HashSet;
-                results.tags_removed += replacements.len();
-                results.tags_added += replacements.values().collect::<HashSet<_>>().len();
-            } else {
-                results.failed += 1;
-            }
-            if let Some(pb) = &progress {
-                pb.inc(1);
-            }
-        }
-        if let Some(pb) = progress {
-            pb.finish_with_message("Done");
-        }
+            },
+        )?
     } else {
         // Non-interactive mode: parallel processing
-        results = crate::commands::process_pages_parallel(&pages, show_progress, |page| {
+        let record_details = format == ctag::models::OutputFormat::Json;
+        crate::commands::process_pages_parallel(&pages, show_progress, |page| {
             let page_id = match page.page_id() {
                 Some(id) => id,
                 None => return crate::commands::ActionResult::Skipped,
@@ -296,9 +286,12 @@ pub fn run(
 
             let replacements = if let Some(regex_pairs) = &compiled_regexes {
                 let current_tags = client.get_page_tags(page_id).unwrap_or_default();
-                ctag::api::compute_replacements_by_regex(current_tags, regex_pairs)
+                Cow::Owned(ctag::api::compute_replacements_by_regex(
+                    current_tags,
+                    regex_pairs,
+                ))
             } else {
-                tag_mapping.clone()
+                Cow::Borrowed(&tag_mapping)
             };
 
             if replacements.is_empty() && args.regex {
@@ -310,28 +303,30 @@ pub fn run(
                 let removed_count = replacements.len();
                 let added_count = replacements.values().collect::<HashSet<_>>().len();
 
-                let detail = ctag::models::ActionDetail {
-                    page_id: page_id.to_string(),
-                    title: page.title.as_deref().unwrap_or("Unknown").to_string(),
-                    space: page.space_name().to_string(),
-                    url: page.printable_clickable_title(client.base_url()), // This has escape codes but is what we have for now. Ideally plain URL.
-                    tags_added: replacements.values().cloned().collect(),
-                    tags_removed: replacements.keys().cloned().collect(),
-                };
+                let detail = record_details.then(|| {
+                    ctag::models::ActionDetail::new(
+                        page,
+                        client.base_url(),
+                        replacements.values().cloned().collect(),
+                        replacements.keys().cloned().collect(),
+                    )
+                });
 
                 crate::commands::ActionResult::Success {
                     added: added_count,
                     removed: removed_count,
-                    detail: Some(detail),
+                    detail,
                 }
             } else {
                 crate::commands::ActionResult::Failed
             }
-        });
-    }
+        })
+    };
     // Display results
-    ui::print_summary(&results, format);
-    Ok(())
+    if show_summary {
+        ui::print_summary(&results, format)?;
+    }
+    Ok(results)
 }
 
 #[cfg(test)]
@@ -346,6 +341,27 @@ mod tests {
         assert_eq!(mapping.get("foo"), Some(&"bar".to_string()));
     }
 
+    #[test]
+    fn parse_tag_pairs_last_duplicate_wins() {
+        let input = vec!["old=first".to_string(), "old=second".to_string()];
+        let mapping = parse_tag_pairs(&input, false).unwrap();
+        assert_eq!(mapping.len(), 1);
+        assert_eq!(mapping.get("old"), Some(&"second".to_string()));
+    }
+
+    #[test]
+    fn parse_tag_pairs_regex_last_duplicate_wins() {
+        let input = vec![
+            "old-.*".to_string(),
+            "first".to_string(),
+            " old-.* ".to_string(),
+            "second".to_string(),
+        ];
+        let mapping = parse_tag_pairs(&input, true).unwrap();
+        assert_eq!(mapping.len(), 1);
+        assert_eq!(mapping.get("old-.*"), Some(&"second".to_string()));
+    }
+
     #[test]
     fn parse_tag_pairs_rejects_missing_equal_sign() {
         let input = vec!["invalidpair".to_string()];
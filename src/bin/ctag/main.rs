@@ -34,6 +34,18 @@ struct Cli {
     /// Show detailed output (shortcut for --format verbose)
     #[arg(short, long, global = true)]
     verbose: bool,
+
+    /// Don't reuse search results or page tags fetched earlier in the run
+    #[arg(long, global = true)]
+    no_cache: bool,
+
+    /// Maximum number of pages updated concurrently
+    #[arg(long, default_value_t = 8, global = true)]
+    max_concurrency: usize,
+
+    /// Limit requests sent to Confluence per second (unlimited by default)
+    #[arg(long, global = true)]
+    max_requests_per_second: Option<f64>,
 }
 
 #[derive(Subcommand)]
@@ -49,9 +61,17 @@ enum Commands {
 }
 
 fn main() -> Result<()> {
+    // Parse first so --help, --version and usage errors exit before any setup.
+    let cli = Cli::parse();
     dotenv().ok();
     env_logger::init();
-    let cli = Cli::parse();
+
+    // Tag updates are bound by Confluence round-trips rather than CPU, so size
+    // the worker pool by the number of in-flight requests we want.
+    rayon::ThreadPoolBuilder::new()
+        .num_threads(cli.max_concurrency.max(1))
+        .build_global()
+        .context("Failed to configure the worker pool")?;
 
     // Determine the output format
     let format = if let Some(f) = cli.format {
@@ -63,20 +83,28 @@ fn main() -> Result<()> {
     };
 
     // Check environment variables
-    let url = env::var("ATLASSIAN_URL").context("ATLASSIAN_URL must be set")?;
-    let username = env::var("ATLASSIAN_USERNAME").context("ATLASSIAN_USERNAME must be set")?;
-    let token = env::var("ATLASSIAN_TOKEN").context("ATLASSIAN_TOKEN must be set")?;
-    let client = api::ConfluenceClient::new(url, username, token);
+    let [url, username, token] = required_env_vars(
+        ["ATLASSIAN_URL", "ATLASSIAN_USERNAME", "ATLASSIAN_TOKEN"],
+        |name| env::var(name).ok(),
+    )?;
+    let mut client = api::ConfluenceClient::new(url, username, token);
+    if let Some(rps) = cli.max_requests_per_second {
+        anyhow::ensure!(rps > 0.0, "--max-requests-per-second must be positive");
+        client = client.with_rate_limit(rps);
+    }
+    if cli.no_cache {
+        client = client.without_caching();
+    }
 
     match cli.command {
         Commands::Add(args) => {
-            commands::add::run(args, &client, cli.dry_run, cli.progress, format)?
+            commands::add::run(args, &client, cli.dry_run, cli.progress, format, true)?;
         }
         Commands::Remove(args) => {
-            commands::remove::run(args, &client, cli.dry_run, cli.progress, format)?
+            commands::remove::run(args, &client, cli.dry_run, cli.progress, format, true)?;
         }
         Commands::Replace(args) => {
-            commands::replace::run(args, &client, cli.dry_run, cli.progress, format)?
+            commands::replace::run(args, &client, cli.dry_run, cli.progress, format, true)?;
         }
         Commands::FromJson(args) => {
             commands::from_json::run(args, &client, cli.dry_run, cli.progress, format)?
@@ -89,6 +117,33 @@ fn main() -> Result<()> {
     Ok(())
 }
 
+/// Read the given variables through `lookup` (normally the environment),
+/// reporting all missing ones at once. Values are trimmed, and blank values
+/// count as missing.
+fn required_env_vars<const N: usize>(
+    names: [&str; N],
+    lookup: impl Fn(&str) -> Option<String>,
+) -> Result<[String; N]> {
+    let values = names.map(|name| {
+        lookup(name)
+            .map(|v| v.trim().to_string())
+            .filter(|v| !v.is_empty())
+    });
+    let missing: Vec<&str> = names
+        .iter()
+        .zip(&values)
+        .filter(|(_, value)| value.is_none())
+        .map(|(name, _)| *name)
+        .collect();
+    if !missing.is_empty() {
+        anyhow::bail!(
+            "{} must be set (in the environment or a .env file)",
+            missing.join(", ")
+        );
+    }
+    Ok(values.map(Option::unwrap_or_default))
+}
+
 #[cfg(test)]
 mod tests {
     use super::*;
@@ -107,4 +162,30 @@ mod tests {
             version, cargo_version
         );
     }
+
+    fn lookup(name: &str) -> Option<String> {
+        match name {
+            "SET" => Some("value".to_string()),
+            "PADDED" => Some("  https://example.com \n".to_string()),
+            "BLANK" => Some("   ".to_string()),
+            _ => None,
+        }
+    }
+
+    #[test]
+    fn required_env_vars_lists_every_missing_variable() {
+        let err = required_env_vars(["UNSET_A", "SET", "UNSET_B"], lookup)
+            .unwrap_err()
+            .to_string();
+        assert!(err.starts_with("UNSET_A, UNSET_B must be set"));
+    }
+
+    #[test]
+    fn required_env_vars_trims_values() {
+        assert_eq!(
+            required_env_vars(["PADDED"], lookup).unwrap(),
+            ["https://example.com".to_string()]
+        );
+        assert!(required_env_vars(["BLANK"], lookup).is_err());
+    }
 }
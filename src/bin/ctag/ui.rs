@@ -1,4 +1,5 @@
 use colored::*;
+use dialoguer::Confirm;
 use indicatif::{ProgressBar, ProgressStyle};
 
 pub fn print_step(msg: &str) {
@@ -9,6 +10,12 @@ pub fn print_substep(msg: &str) {
     eprintln!("  {} {}", "-".dimmed(), msg);
 }
 
+pub fn print_substeps(lines: &[String]) {
+    for line in lines {
+        print_substep(line);
+    }
+}
+
 pub fn print_success(msg: &str) {
     eprintln!("{} {}", "✓".bold().green(), msg.green());
 }
@@ -29,6 +36,15 @@ pub fn print_dry_run(msg: &str) {
     eprintln!("{} {}", "[DRY RUN]".bold().purple(), msg.dimmed());
 }
 
+/// Ask a yes/no question, hiding the progress bar while waiting for input
+pub fn confirm(prompt: &str, progress: Option<&ProgressBar>) -> dialoguer::Result<bool> {
+    let ask = || Confirm::new().with_prompt(prompt).interact();
+    match progress {
+        Some(pb) => pb.suspend(ask),
+        None => ask(),
+    }
+}
+
 pub fn create_progress_bar(len: u64) -> ProgressBar {
     let pb = ProgressBar::new(len);
     pb.set_style(
@@ -40,6 +56,27 @@ pub fn create_progress_bar(len: u64) -> ProgressBar {
     pb
 }
 
+/// Adapts an indicatif progress bar to the library's progress reporting
+pub struct BarReporter(pub ProgressBar);
+
+impl ctag::ops::ProgressReporter for BarReporter {
+    fn set_total(&self, total: u64) {
+        self.0.set_length(total);
+    }
+
+    fn inc(&self, delta: u64) {
+        self.0.inc(delta);
+    }
+
+    fn finish(&self) {
+        self.0.finish_with_message("Done");
+    }
+
+    fn message(&self, msg: &str) {
+        self.0.set_message(msg.to_string());
+    }
+}
+
 pub fn create_pagination_spinner(msg: &str) -> ProgressBar {
     let pb = ProgressBar::new_spinner();
     pb.set_style(
@@ -53,10 +90,20 @@ pub fn create_pagination_spinner(msg: &str) -> ProgressBar {
 }
 
 // Formatters for results
-pub fn print_summary(results: &ctag::models::ProcessResults, format: ctag::models::OutputFormat) {
+/// Print the run summary to stdout. Write errors (such as a closed pipe)
+/// are returned rather than panicking.
+pub fn print_summary(
+    results: &ctag::models::ProcessResults,
+    format: ctag::models::OutputFormat,
+) -> anyhow::Result<()> {
     match format {
         ctag::models::OutputFormat::Json => {
-            println!("{}", serde_json::to_string_pretty(results).unwrap());
+            // Serialize straight into stdout; large runs carry a detail
+            // entry per page and don't need an intermediate String
+            use std::io::Write;
+            let mut out = std::io::stdout().lock();
+            serde_json::to_writer_pretty(&mut out, results)?;
+            writeln!(out)?;
         }
         ctag::models::OutputFormat::Csv => {
             #[derive(serde::Serialize)]
@@ -81,22 +128,24 @@ pub fn print_summary(results: &ctag::models::ProcessResults, format: ctag::model
                 tags_removed: results.tags_removed,
             };
             let mut wtr = csv::Writer::from_writer(std::io::stdout());
-            wtr.serialize(summary).unwrap();
-            wtr.flush().unwrap();
+            wtr.serialize(summary)?;
+            wtr.flush()?;
         }
         ctag::models::OutputFormat::Verbose => {
-            print_summary_table(results);
+            print_summary_table(results)?;
         }
         ctag::models::OutputFormat::Simple => {
-            print_summary_minimal(results);
+            print_summary_minimal(results)?;
         }
     }
+    Ok(())
 }
 
-fn print_summary_table(results: &ctag::models::ProcessResults) {
+fn print_summary_table(results: &ctag::models::ProcessResults) -> std::io::Result<()> {
     use comfy_table::modifiers::UTF8_ROUND_CORNERS;
     use comfy_table::presets::UTF8_FULL;
     use comfy_table::*;
+    use std::io::Write;
     let mut table = Table::new();
     table
         .load_preset(UTF8_FULL)
@@ -115,37 +164,28 @@ fn print_summary_table(results: &ctag::models::ProcessResults) {
         Cell::new("Total Pages Found").add_attribute(Attribute::Bold),
         Cell::new(results.total.to_string()).fg(Color::White),
     ]);
-    table.add_row(vec![
-        Cell::new("Processed").fg(Color::Blue),
-        Cell::new(results.processed.to_string()).fg(Color::Blue),
-    ]);
-    table.add_row(vec![
-        Cell::new("Skipped").fg(Color::Yellow),
-        Cell::new(results.skipped.to_string()).fg(Color::Yellow),
-    ]);
-    table.add_row(vec![
-        Cell::new("Successful").fg(Color::Green),
-        Cell::new(results.success.to_string()).fg(Color::Green),
-    ]);
-    table.add_row(vec![
-        Cell::new("Failed").fg(Color::Red),
-        Cell::new(results.failed.to_string()).fg(Color::Red),
-    ]);
+    let mut rows = vec![
+        ("Processed", results.processed, Color::Blue),
+        ("Skipped", results.skipped, Color::Yellow),
+        ("Successful", results.success, Color::Green),
+        ("Failed", results.failed, Color::Red),
+    ];
     if results.tags_added > 0 || results.tags_removed > 0 {
+        rows.push(("Tags Added", results.tags_added, Color::Green));
+        rows.push(("Tags Removed", results.tags_removed, Color::Red));
+    }
+    for (label, count, color) in rows {
         table.add_row(vec![
-            Cell::new("Tags Added").fg(Color::Green),
-            Cell::new(results.tags_added.to_string()).fg(Color::Green),
-        ]);
-        table.add_row(vec![
-            Cell::new("Tags Removed").fg(Color::Red),
-            Cell::new(results.tags_removed.to_string()).fg(Color::Red),
+            Cell::new(label).fg(color),
+            Cell::new(count.to_string()).fg(color),
         ]);
     }
     eprintln!("\n{}", "Execution Summary".bold().bright_white());
-    println!("{table}");
+    writeln!(std::io::stdout(), "{table}")
 }
 
-pub fn print_summary_minimal(results: &ctag::models::ProcessResults) {
+pub fn print_summary_minimal(results: &ctag::models::ProcessResults) -> std::io::Result<()> {
+    use std::io::Write;
     let mut parts = Vec::new();
 
     parts.push(format!(
@@ -194,7 +234,7 @@ pub fn print_summary_minimal(results: &ctag::models::ProcessResults) {
         ));
     }
 
-    println!("\n{}", parts.join(" | "));
+    writeln!(std::io::stdout(), "\n{}", parts.join(" | "))
 }
 
 pub fn print_header(title: &str) {
@@ -204,13 +244,31 @@ pub fn print_header(title: &str) {
 }
 
 pub fn print_page_action(action: &str, title: &str, space: &str) {
-    eprintln!(
+    let _ = write_page_action(&mut std::io::stderr(), action, title, space, &[]);
+}
+
+/// Write a page action followed by its substeps. Dry runs list every
+/// matching page, so they pass a buffered stderr rather than printing
+/// line by line.
+pub fn write_page_action(
+    out: &mut impl std::io::Write,
+    action: &str,
+    title: &str,
+    space: &str,
+    substeps: &[String],
+) -> std::io::Result<()> {
+    writeln!(
+        out,
         "{} {} {}",
         "→".bright_blue().bold(),
         action.bold(),
         title.bright_white()
-    );
-    eprintln!("  {} {}", "space:".dimmed(), space.cyan());
+    )?;
+    writeln!(out, "  {} {}", "space:".dimmed(), space.cyan())?;
+    for line in substeps {
+        writeln!(out, "  {} {}", "-".dimmed(), line)?;
+    }
+    Ok(())
 }
 
 // ========== Shared Formatting Functions ==========
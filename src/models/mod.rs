@@ -48,6 +48,23 @@ impl SearchResultItem {
         self.content.as_ref().and_then(|c| c.id.as_deref())
     }
 
+    /// Tags returned inline with the search result (`content.metadata.labels`).
+    /// Returns None if labels weren't expanded or the server truncated the
+    /// list, in which case the caller has to ask for the page's labels.
+    pub fn inline_tags(&self) -> Option<Vec<String>> {
+        let labels = self.content.as_ref()?.metadata.as_ref()?.labels.as_ref()?;
+        let has_more = labels
+            .links
+            .as_ref()
+            .is_some_and(|links| links.get("next").is_some());
+        let full_page =
+            matches!((labels.size, labels.limit), (Some(size), Some(limit)) if size >= limit);
+        if has_more || full_page {
+            return None;
+        }
+        Some(labels.results.iter().map(|l| l.name.clone()).collect())
+    }
+
     pub fn printable_clickable_title(&self, base_url: &str) -> String {
         let title = self.title.as_deref().unwrap_or("Unknown");
         let sanitized = sanitize_text(title);
@@ -66,6 +83,14 @@ impl SearchResultItem {
 
 /// Sanitize text by decoding HTML entities and removing control characters (except whitespace)
 pub fn sanitize_text(text: &str) -> String {
+    // Most titles contain neither entities nor control characters; one scan
+    // is enough to return them as-is
+    if text
+        .chars()
+        .all(|c| c != '&' && (!c.is_control() || c.is_whitespace()))
+    {
+        return text.to_string();
+    }
     // First decode HTML entities (e.g., &#128274; -> 🔒)
     let decoded = html_escape::decode_html_entities(text);
     // Then filter control characters but keep whitespace
@@ -91,6 +116,13 @@ pub struct Content {
     pub space: Option<Space>,
     #[serde(default)]
     pub ancestors: Vec<Ancestor>,
+    #[serde(default)]
+    pub metadata: Option<ContentMetadata>,
+}
+
+#[derive(Debug, Clone, Serialize, Deserialize)]
+pub struct ContentMetadata {
+    pub labels: Option<LabelsResponse>,
 }
 
 #[derive(Debug, Clone, Serialize, Deserialize)]
@@ -126,6 +158,10 @@ pub struct Label {
 #[derive(Debug, Clone, Serialize, Deserialize)]
 pub struct LabelsResponse {
     pub results: Vec<Label>,
+    pub size: Option<i32>,
+    pub limit: Option<i32>,
+    #[serde(rename = "_links")]
+    pub links: Option<serde_json::Value>,
 }
 
 #[derive(Debug, Clone, Serialize, Deserialize)]
@@ -138,6 +174,26 @@ pub struct ActionDetail {
     pub tags_removed: Vec<String>,
 }
 
+impl ActionDetail {
+    /// Describe a change made to `page`.
+    /// `url` holds the terminal hyperlink used for display, not a plain URL.
+    pub fn new(
+        page: &SearchResultItem,
+        base_url: &str,
+        tags_added: Vec<String>,
+        tags_removed: Vec<String>,
+    ) -> Self {
+        Self {
+            page_id: page.page_id().unwrap_or_default().to_string(),
+            title: page.title.as_deref().unwrap_or("Unknown").to_string(),
+            space: page.space_name().to_string(),
+            url: page.printable_clickable_title(base_url),
+            tags_added,
+            tags_removed,
+        }
+    }
+}
+
 #[derive(Debug, Clone, Serialize, Deserialize)]
 pub struct ProcessResults {
     pub total: usize,
@@ -168,11 +224,25 @@ impl ProcessResults {
             details: Vec::new(),
         }
     }
+
+    /// Add another set of results into this one
+    pub fn merge(&mut self, other: ProcessResults) {
+        self.total += other.total;
+        self.processed += other.processed;
+        self.skipped += other.skipped;
+        self.success += other.success;
+        self.failed += other.failed;
+        self.aborted |= other.aborted;
+        self.tags_added += other.tags_added;
+        self.tags_removed += other.tags_removed;
+        self.details.extend(other.details);
+    }
 }
 
 #[cfg(test)]
 mod tests {
-    use super::ProcessResults;
+    use super::{ActionDetail, ProcessResults, SearchResultItem};
+    use serde_json::json;
 
     #[test]
     fn process_results_new_initializes_counts_correctly() {
@@ -186,4 +256,68 @@ mod tests {
         assert_eq!(pr.tags_added, 0);
         assert_eq!(pr.tags_removed, 0);
     }
+
+    #[test]
+    fn process_results_merge_adds_counts() {
+        let mut a = ProcessResults::new(3);
+        a.success = 2;
+        a.tags_added = 4;
+        let mut b = ProcessResults::new(2);
+        b.failed = 1;
+        b.aborted = true;
+        a.merge(b);
+        assert_eq!(a.total, 5);
+        assert_eq!(a.success, 2);
+        assert_eq!(a.failed, 1);
+        assert_eq!(a.tags_added, 4);
+        assert!(a.aborted);
+    }
+
+    #[test]
+    fn inline_tags_reads_expanded_labels() {
+        let item: SearchResultItem = serde_json::from_value(json!({
+            "content": {
+                "id": "1",
+                "metadata": {"labels": {"results": [{"name": "a"}, {"name": "b"}], "size": 2, "limit": 200}}
+            }
+        }))
+        .unwrap();
+        assert_eq!(
+            item.inline_tags(),
+            Some(vec!["a".to_string(), "b".to_string()])
+        );
+    }
+
+    #[test]
+    fn inline_tags_falls_back_when_missing_or_truncated() {
+        let missing: SearchResultItem =
+            serde_json::from_value(json!({"content": {"id": "1"}})).unwrap();
+        assert_eq!(missing.inline_tags(), None);
+
+        let truncated: SearchResultItem = serde_json::from_value(json!({
+            "content": {
+                "id": "1",
+                "metadata": {"labels": {
+                    "results": [{"name": "a"}],
+                    "_links": {"next": "/rest/api/content/1/label?start=1"}
+                }}
+            }
+        }))
+        .unwrap();
+        assert_eq!(truncated.inline_tags(), None);
+    }
+
+    #[test]
+    fn action_detail_describes_page() {
+        let item: SearchResultItem = serde_json::from_value(json!({
+            "title": "Runbook",
+            "content": {"id": "42", "space": {"name": "Ops"}}
+        }))
+        .unwrap();
+        let detail = ActionDetail::new(&item, "https://x.atlassian.net", vec!["a".into()], vec![]);
+        assert_eq!(detail.page_id, "42");
+        assert_eq!(detail.title, "Runbook");
+        assert_eq!(detail.space, "Ops");
+        assert!(detail.url.contains("pageId=42"));
+    }
 }
@@ -1,6 +1,7 @@
 use crate::api::ConfluenceClient;
 use crate::models::{ProcessResults, SearchResultItem};
 use anyhow::Result;
+use std::sync::Arc;
 
 pub struct OpsOptions {
     pub show_progress: bool,
@@ -32,6 +33,26 @@ pub enum ActionResult {
     Skipped,
 }
 
+impl ActionResult {
+    /// Count this outcome in `results`
+    pub fn record(self, results: &mut ProcessResults) {
+        match self {
+            ActionResult::Success {
+                added,
+                removed,
+                detail,
+            } => {
+                results.success += 1;
+                results.tags_added += added;
+                results.tags_removed += removed;
+                results.details.extend(detail);
+            }
+            ActionResult::Failed => results.failed += 1,
+            ActionResult::Skipped => results.skipped += 1,
+        }
+    }
+}
+
 /// Helper to run action on pages in parallel
 pub fn process_pages_parallel<F>(
     pages: &[SearchResultItem],
@@ -42,60 +63,35 @@ where
     F: Fn(&SearchResultItem) -> ActionResult + Sync + Send,
 {
     use rayon::prelude::*;
-    use std::sync::atomic::{AtomicUsize, Ordering};
-    use std::sync::Mutex;
 
     let reporter = progress_reporter.unwrap_or(&NoOpProgress);
     reporter.set_total(pages.len() as u64);
 
-    let success_count = AtomicUsize::new(0);
-    let failed_count = AtomicUsize::new(0);
-    let skipped_count = AtomicUsize::new(0);
-    let added_count = AtomicUsize::new(0);
-    let removed_count = AtomicUsize::new(0);
-
-    // We need to collect details safely across threads
-    let details = Mutex::new(Vec::new());
-
-    pages.par_iter().for_each(|page| {
-        match action(page) {
-            ActionResult::Success {
-                added,
-                removed,
-                detail,
-            } => {
-                success_count.fetch_add(1, Ordering::Relaxed);
-                added_count.fetch_add(added, Ordering::Relaxed);
-                removed_count.fetch_add(removed, Ordering::Relaxed);
-                if let Some(d) = detail {
-                    if let Ok(mut g) = details.lock() {
-                        g.push(d);
-                    }
-                }
-            }
-            ActionResult::Failed => {
-                failed_count.fetch_add(1, Ordering::Relaxed);
-            }
-            ActionResult::Skipped => {
-                skipped_count.fetch_add(1, Ordering::Relaxed);
-            }
-        }
-        reporter.inc(1);
-    });
+    // Each worker tallies into its own ProcessResults; the partial tallies
+    // are merged at the end instead of contending on shared counters
+    let mut results = pages
+        .par_iter()
+        .fold(
+            || ProcessResults::new(0),
+            |mut tally, page| {
+                action(page).record(&mut tally);
+                reporter.inc(1);
+                tally
+            },
+        )
+        .reduce(
+            || ProcessResults::new(0),
+            |mut a, b| {
+                a.merge(b);
+                a
+            },
+        );
 
     reporter.finish();
 
-    ProcessResults {
-        total: pages.len(),
-        processed: pages.len(),
-        skipped: skipped_count.load(Ordering::Relaxed),
-        success: success_count.load(Ordering::Relaxed),
-        failed: failed_count.load(Ordering::Relaxed),
-        aborted: false,
-        tags_added: added_count.load(Ordering::Relaxed),
-        tags_removed: removed_count.load(Ordering::Relaxed),
-        details: details.into_inner().unwrap_or_default(),
-    }
+    results.total = pages.len();
+    results.processed = pages.len();
+    results
 }
 
 pub fn get_matching_pages(
@@ -103,7 +99,7 @@ pub fn get_matching_pages(
     cql: &str,
     limit: usize,
     progress_reporter: Option<&dyn ProgressReporter>,
-) -> Result<Vec<SearchResultItem>> {
+) -> Result<Arc<[SearchResultItem]>> {
     if let Some(p) = progress_reporter {
         p.message(&format!("Finding pages matching: {}", cql));
         client.get_all_cql_results_with_progress(